@@ -7,21 +7,38 @@ from PIL import Image, ImageTk
 from config import Config
 from utils import DiscUtils, Logger
 from modules.handlers.makemkv import MakeMKVHandler
-from modules.handlers.handbrake import HandBrakeHandler
-from modules.api.omdb import omdb_api
-from modules.api.tvmaze import TVMazeAPI
+from modules.jobs.pipeline import TranscodeStage, transcode_title
+from modules.jobs.supervisor import JobSupervisor
+from modules.jobs.progress_bus import ProgressBus
+from modules.api.cache_store import CacheStore
+from modules.api.metadata_resolver import MetadataResolver
 from views.mainmenu import MainMenu
 from views.toolbar import ToolBar
-from views.widgets.riptable import RipTable
+from views.widgets.drivepanel import DrivePanel
 from views.widgets.sideheadertable import SideHeaderTable
-from views.dialogs.progress import ProgressDialog
 from views.windows.searchomdb import SearchDialog
 from views.windows.episode_selector import EpisodeSelectorWizard
 from views.windows.preferences import PreferencesWindow
 from views.windows.riplibrary import RipLibraryWindow
 from data.ripdatabase import RippingDatabase
 
+def _panel_attr(name):
+    """Disc state lives on the selected drive tab; expose it as if it were the application's own."""
+    return property(lambda self: getattr(self.active_panel, name),
+                    lambda self, value: setattr(self.active_panel, name, value))
+
 class Application(tk.Tk):
+    iso_path = _panel_attr('iso_path')              # Path of ISO image
+    rows = _panel_attr('rows')                      # Scanned titles
+    options = _panel_attr('options')                # Combobox options
+    current_title = _panel_attr('current_title')    # Title being ripped
+    media_type = _panel_attr('media_type')
+    title_year = _panel_attr('title_year')
+    poster_img = _panel_attr('poster_img')
+    disc_metadata = _panel_attr('disc_metadata')
+
+    COLUMNS = ["Select", "Index", "Duration", "Title Name", "Rip Progress", "Transcode Progress"]
+
     def __init__(self):
         super().__init__()
         self.title("RipMedia v4.0")
@@ -38,32 +55,33 @@ class Application(tk.Tk):
             "edit -> edit_titles": self.edit_series,
             "edit -> edit_metadata": self.edit_title_metadata,
             "tools -> history": self.open_rip_library,
+            "tools -> clear_negative_cache": self.on_clear_negative_cache,
             "tools -> preferences": lambda: PreferencesWindow(self, on_apply=self.apply_settings),
             "rip -> start_rip": self.on_rip,
-            "rip -> stop_rip": lambda: messagebox.showinfo("Rip", "Stop Rip feature not implemented yet."),
+            "rip -> stop_rip": self.on_stop_rip,
+            "rip -> cancel_selected": self.on_cancel_selected,
         }
-        self.iso_path = None # Placeholder for path of ISO image
-        self.rows = []  # Placeholder for scanned titles
-        self.options = []  # Placeholder for combobox options
         self.disc_info = "Title: None\nPlot:\nNone"  # Placeholder for disc/ISO metadata
-        self.current_title = None  # Placeholder for current title being ripped
-        self.rip_thread = None
-        self.media_type = None
-        self.title_year = None
+        self.drive_panels = {}  # Drive index or ISO path -> DrivePanel
+        # One transcode pool shared by every drive
+        self.transcode_stage = TranscodeStage(self.transcode_title).start()
         self.build_UI()
+        # Worker progress reaches the widgets through the bus, drained at a fixed frame rate
+        ProgressBus.default().attach(self, Config.get_int('UI Refresh Rate', 10))
     
     def build_UI(self):
         self.edit_img = ImageTk.PhotoImage(Image.open("assets/images/.png/edit (32x32).png"))
-        columns = ["Select", "Index", "Duration", "Title Name", "Rip Progress", "Transcode Progress"]
         # Create the main menu
         self.main_menu = MainMenu(self, self.callbacks)
         self.config(menu=self.main_menu)
         # ToolBar for buttons
         self.toolbar = ToolBar(self, self.callbacks, relief=tk.RAISED, borderwidth=2)
         self.toolbar.pack(side=tk.TOP, fill=tk.X)
-        # Create the RipTable
-        self.rip_window = RipTable(self, columns, self.rows, self.options)
-        self.rip_window.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+        # One tab (title table + status line) per drive or ISO
+        self.drive_tabs = ttk.Notebook(self)
+        self.drive_tabs.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+        self.drive_tabs.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.drive_tabs.add(DrivePanel(self.drive_tabs, self, self.COLUMNS), text="Disc/ISO")
         # Disc/ISO Metadata frame
         self.metadata_frame = ttk.LabelFrame(self, text="Disc/ISO Metadata", height=75)
         self.metadata_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
@@ -79,241 +97,308 @@ class Application(tk.Tk):
         self.status_bar = ttk.Label(self, textvariable=self.status_var, relief=tk.SUNKEN, anchor="w")
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
+    @property
+    def active_panel(self):
+        return self.nametowidget(self.drive_tabs.select())
+
+    @property
+    def rip_window(self):
+        return self.active_panel.rip_table
+
+    def get_panel(self, key, drive=None, iso_path=None):
+        """Return the tab for a drive index or ISO path, creating it (or claiming the empty start tab) if needed.
+
+        A drive's existing tab is switched to the disc now in it, which may have been swapped.
+        """
+        panel = self.drive_panels.get(key)
+        if panel is not None and not panel.is_busy():
+            panel.load_disc(drive, iso_path)
+        elif panel is None:
+            unclaimed = [p for p in self.drive_tabs.winfo_children()
+                         if p not in self.drive_panels.values() and not p.rows]
+            if unclaimed:
+                panel = unclaimed[0]
+                panel.load_disc(drive, iso_path)
+            else:
+                panel = DrivePanel(self.drive_tabs, self, self.COLUMNS, drive=drive, iso_path=iso_path)
+                self.drive_tabs.add(panel)
+            self.drive_panels[key] = panel
+        self.drive_tabs.tab(panel, text=panel.label)
+        return panel
+
+    def on_tab_changed(self, event=None):
+        """Show the metadata of the disc in the selected tab."""
+        panel = self.active_panel
+        if panel.poster_img:
+            self.poster.config(image=panel.poster_img)
+        else:
+            self.poster.config(image="", text="Poster Placeholder", anchor=tk.CENTER)
+        self.meta_table.update_data(panel.disc_metadata or [""] * len(self.meta_table.headers))
+
     def on_open_dvd(self):
         is_inserted = DiscUtils.is_disc_inserted()
         if is_inserted:
-            progress_dialog = ProgressDialog(self, title="Scanning...", message="Initializing...", mode="indeterminate")
-        
-            mkv = MakeMKVHandler()
-            def callback(title, message, percent):
-                def update():
-                    if percent is not None:
-                        if progress_dialog._mode == 'indeterminate':
-                            progress_dialog.switch_to_determinate()
-                        progress_dialog.update_progress(value=percent, message=message)
-                    else:
-                        progress_dialog.update_progress(message=message)
-                self.after(0, update)
-            mkv.progress_callback = callback
-            thread = mkv.scan()
-        
-            def close_when_done():
-                thread.join()
-                self.after(0, progress_dialog.close)
-                self.rows = mkv.scan_results
-                self.rip_window.row_data = self.rows
-                self.rip_window.selected_vars.clear()
-                self.rip_window.combobox_vars.clear()
-                for widget in self.rip_window.rip_widgets:
-                    widget.destroy()
-                self.rip_window.build_header()
-                self.rip_window.build_rows()
-                self.toolbar.btn_rip.config(state=tk.NORMAL)
-        
-            threading.Thread(target=close_when_done, daemon=True).start()
+            self.status_var.set("Looking for drives...")
 
-            self.current_title = self.guess_title()
-            self.update_metadata(self.current_title)
-            if self.media_type == "series":
-                self.populate_series(self.current_title)
-            elif self.media_type == "movie":
-                self.populate_movie(self.current_title)
+            def find_drives():
+                try:
+                    drives = MakeMKVHandler().list_drives()
+                except Exception as e:
+                    self.logger.error(f"Failed to enumerate drives: {e}")
+                    self.after(0, lambda err=e: messagebox.showerror("Error", f"Failed to enumerate drives:\n{err}"))
+                    return
+                loaded = [d for d in drives if d['visible'] == MakeMKVHandler.DRIVE_INSERTED]
+                self.after(0, lambda: self.load_drives(loaded))
+
+            threading.Thread(target=find_drives, daemon=True).start()
+
+    def load_drives(self, drives):
+        """Scan every loaded drive concurrently, then resolve metadata for each disc."""
+        self.status_var.set(f"Found {len(drives)} disc(s)")
+        panels = [self.get_panel(drive['index'], drive=drive) for drive in drives]
+        for panel in panels:
+            self.scan_disc(panel, MakeMKVHandler(disc_idx=panel.disc_idx, volume_label=panel.volume_label,
+                                                 device=panel.device))
+        for panel in panels:
+            self.identify_disc(panel)
+        if panels:
+            self.drive_tabs.select(panels[0])
 
     def on_open_iso(self):
-        self.iso_path = filedialog.askopenfilename(title="Select ISO File", filetypes=[("ISO Files", "*.iso")])
-        if self.iso_path:
-            progress_dialog = ProgressDialog(self, title="Scanning...", message="Initializing...", mode="indeterminate")
-        
-            mkv = MakeMKVHandler(iso_path=self.iso_path)
-            def callback(title, message, percent):
-                def update():
-                    if percent is not None:
-                        if progress_dialog._mode == 'indeterminate':
-                            progress_dialog.switch_to_determinate()
-                        progress_dialog.update_progress(value=percent, message=message)
-                    else:
-                        progress_dialog.update_progress(message=message)
-                self.after(0, update)
-            mkv.progress_callback = callback
-            thread = mkv.scan()
-        
-            def close_when_done():
-                thread.join()
-                self.after(0, progress_dialog.close)
-                self.rows = mkv.scan_results
-                self.rip_window.row_data = self.rows
-                self.rip_window.selected_vars.clear()
-                self.rip_window.combobox_vars.clear()
-                for widget in self.rip_window.rip_widgets:
-                    widget.destroy()
-                self.rip_window.build_header()
-                self.rip_window.build_rows()
-                self.toolbar.btn_rip.config(state=tk.NORMAL)
-        
-            threading.Thread(target=close_when_done, daemon=True).start()
-
-            self.current_title = self.guess_title()
-            self.update_metadata(self.current_title)
-            if self.media_type == "series":
-                self.populate_series(self.current_title)
-            elif self.media_type == "movie":
-                self.populate_movie(self.current_title)
+        iso_path = filedialog.askopenfilename(title="Select ISO File", filetypes=[("ISO Files", "*.iso")])
+        if iso_path:
+            panel = self.get_panel(iso_path, iso_path=iso_path)
+            self.drive_tabs.select(panel)
+            self.scan_disc(panel, MakeMKVHandler(iso_path=iso_path))
+            self.identify_disc(panel)
+
+    def scan_disc(self, panel, mkv):
+        """Scan a drive or ISO in the background, reporting progress on the panel's status line."""
+        def callback(title, message, percent):
+            panel.post_status(f"{message} ({percent}%)" if percent is not None else message)
+        mkv.progress_callback = callback
+        # A background re-scan only replaces the titles if nothing is being ripped from them yet
+        mkv.revalidated_callback = lambda rows: self.after(
+            0, lambda: panel.is_busy() or self.show_titles(panel, rows))
+        thread = mkv.scan()
+        final_thread = panel.scan_thread = mkv.revalidate_thread or thread
+
+        def close_when_done():
+            thread.join()
+            self.after(0, lambda: self.show_titles(panel, mkv.scan_results))
+            # Queued behind any re-scanned titles, so the layout is the disc's real one
+            final_thread.join()
+            self.after(0, lambda: self.identify_by_layout(panel))
+
+        threading.Thread(target=close_when_done, daemon=True).start()
+
+    def show_titles(self, panel, rows):
+        panel.rows = rows
+        panel.rip_table.row_data = rows
+        panel.rip_table.rebuild()
+        panel.post_status(f"{len(rows)} title(s) found")  # Queued behind any scan progress still on the bus
+        self.toolbar.btn_rip.config(state=tk.NORMAL)
+
+    def identify_disc(self, panel):
+        """Load a tab's metadata: straight from the learned table if this disc was confirmed before, else from a guess."""
+        disc_key = panel.disc_key
+        # A disc only known by its title layout is checked against the learned table once it's scanned
+        panel.awaiting_layout = disc_key is None
+        learned = RippingDatabase.default().learned_title(disc_key) if disc_key else None
+        if learned:
+            self.logger.info(f"{panel.label} is known as {learned['title']}")
+            self.load_metadata(learned['title'], panel, season=learned['season'], known=learned)
+        elif panel.iso_path:
+            self.load_metadata(self.guess_title(iso_path=panel.iso_path), panel)
+        else:
+            # DRV already reported the volume label, so there is no need to ask wmic for it
+            self.load_metadata(self.guess_title(volume_label=panel.volume_label), panel)
+
+    def identify_by_layout(self, panel):
+        """Switch to the learned title of a disc that couldn't be keyed before its scan finished."""
+        if not panel.awaiting_layout:
+            return
+        panel.awaiting_layout = False
+        learned = RippingDatabase.default().learned_title(panel.disc_key) if panel.disc_key else None
+        if learned and not panel.is_busy():
+            self.logger.info(f"{panel.label} is known as {learned['title']}")
+            self.load_metadata(learned['title'], panel, season=learned['season'], known=learned)
+
+    def load_metadata(self, title, panel=None, season=None, known=None, confirmed=False):
+        """Resolve a disc's metadata in the background while it is scanned; apply_metadata shows it.
+
+        confirmed marks a title picked by the user, which is remembered for the disc once resolved.
+        """
+        panel = panel or self.active_panel
+        panel.current_title = title
+        panel.lookup += 1
+        lookup = panel.lookup
+        self.status_var.set(f"Looking up {title}...")
+        future = MetadataResolver.default().resolve(title, season or self.extract_season(title), known)
+        future.add_done_callback(lambda f: self.after(0, lambda: self.metadata_done(panel, title, f, confirmed, lookup)))
+
+    def metadata_done(self, panel, title, future, confirmed=False, lookup=None):
+        """Apply a finished lookup, or report why it failed instead of leaving "Looking up..." on screen."""
+        if lookup is not None and lookup != panel.lookup:
+            return  # A later lookup (or another disc) has replaced this one
+        error = future.exception()
+        if error:
+            self.logger.error(f"Metadata lookup for {title} failed: {error}")
+            self.status_var.set(f"Lookup for {title} failed: {error}")
+            panel.set_status(f"Metadata lookup failed: {error}")
+            return
+        self.apply_metadata(panel, future.result(), confirmed)
+
+    def remember_title(self, panel):
+        """Remember the tab's resolved title for its disc, so the next load skips every lookup."""
+        if panel.omdb_info and panel.disc_key:
+            try:
+                RippingDatabase.default().remember_title(panel.disc_key, panel.omdb_info, panel.season, panel.show)
+            except Exception as e:
+                self.logger.warning(f"Could not remember title for {panel.label}: {e}")
+
+    def apply_metadata(self, panel, result, confirmed=False):
+        """Show a MetadataResolver result on its drive tab; runs on the Tk thread."""
+        omdb_info = result['omdb']
+        if not omdb_info:
+            dlg = SearchDialog(self, initial_title=result['title'])
+            if dlg.result:
+                self.load_metadata(dlg.result["Title"], panel, confirmed=True)
+            return
+        if result['guess'] != result['title']:
+            self.status_var.set(f"Found {omdb_info['Title']} (matched '{result['guess']}', {result['confidence']:.0%})")
+        else:
+            self.status_var.set(f"Found {omdb_info['Title']}")
+        panel.current_title = omdb_info['Title']
+        panel.media_type = omdb_info["Type"]
+        panel.title_year = omdb_info["Year"]
+        panel.disc_metadata = [
+            omdb_info['Title'],
+            omdb_info['Year'],
+            omdb_info['Plot'],
+            omdb_info['Rated'],
+            omdb_info['Runtime'],
+            omdb_info['Genre'],
+            omdb_info['IMDB']
+        ]
+        panel.poster_img = ImageTk.PhotoImage(result['poster']) if result['poster'] else None
+        panel.omdb_info, panel.show, panel.season = omdb_info, result['show'], result['season']
+        if confirmed:
+            self.remember_title(panel)
+        if panel.media_type == "series":
+            if not result['show']:
+                self.logger.error(f"No series found for {result['title']}")
+                messagebox.showerror("Error", f"No series found for {result['title']}")
+            elif not result['episodes']:
+                self.logger.error(f"No episodes found for {result['show']['name']} Season {result['season']}")
+                messagebox.showerror("Error", f"No episodes found for {result['show']['name']} Season {result['season']}")
+            else:
+                self.fill_series_options(panel, result['show'], result['episodes'])
+        elif panel.media_type == "movie":
+            self.fill_movie_options(panel, omdb_info)
+        # The scan may have finished first; refresh the title names unless the rows are being ripped
+        if panel.rows and not panel.is_busy():
+            panel.rip_table.cmb_options = panel.options
+            panel.rip_table.rebuild()  # New rows default to the first option
+        if panel is self.active_panel:
+            self.on_tab_changed()
             
     def on_open_cd(self):
         pass
 
     def on_rip(self):
-        self.toolbar.btn_rip.config(state=tk.DISABLED)
-        selected = self.rip_window.get_selected()
-        if not selected:
+        panels = [p for p in self.drive_tabs.winfo_children() if not p.is_busy() and p.rip_table.get_selected()]
+        if not panels:
             self.logger.info("Rip: No titles selected")
             messagebox.showinfo("Rip", "No titles selected.")
             return
-
-        mkv = MakeMKVHandler()
+        self.toolbar.btn_rip.config(state=tk.DISABLED)
         output_dir = Config.get("Output Directory")
+        # Every drive rips in its own worker; finished titles meet in the shared transcode stage
+        for panel in panels:
+            self.rip_panel(panel, output_dir)
 
-        def do_rip():
-            self.logger.info("Ripping media from Disc/ISO")
-            if self.iso_path:
-                mkv.rip_selected(selected, output_dir, self.rip_window, iso_path=self.iso_path,
-                                 status_callback=lambda text: self.status_var.set(text))
-            else:
-                mkv.rip_selected(selected, output_dir, self.rip_window, status_callback=lambda text: self.status_var.set(text))
+    def rip_panel(self, panel, output_dir):
+        selected = panel.rip_table.get_selected()
+        self.remember_title(panel)  # Ripping under this title confirms it
+        mkv = MakeMKVHandler(disc_idx=panel.disc_idx)
+        scan_thread = panel.scan_thread
+
+        def run():
+            # The drive can't be ripped while a (re-)scan still has it open
+            if scan_thread and scan_thread.is_alive():
+                panel.post_status("Waiting for the disc scan to finish...")
+                scan_thread.join()
+            self.logger.info(f"Ripping media from {panel.label}")
+            rip_thread = mkv.rip_selected(selected, output_dir, panel.rip_table, iso_path=panel.iso_path,
+                                          status_callback=panel.post_status)
+            if rip_thread:
+                rip_thread.join()
 
-        self.rip_thread = threading.Thread(target=do_rip, daemon=True)
-        self.rip_thread.start()
+        panel.rip_thread = threading.Thread(target=run, daemon=True)
+        panel.rip_thread.start()
         
-    def on_transcode(self, selected):
-        encode_dir = Config.get("Encode Directory")
-        os.makedirs(encode_dir, exist_ok=True)
-
-        self.logger.info("Encoding selected titles...")
-        for i, title in enumerate(selected):
-            raw_title = title.get('final_name') or title['title_name']
-            input_path = os.path.join(Config.get("Output Directory"), f"{raw_title}.mkv")
-            output_path = os.path.join(encode_dir, f"{raw_title}.mkv")
-            self.logger.debug(f"Looking for ripped file: {input_path}")
-            if not os.path.exists(input_path):
-                self.logger.warning(f"Skipping: input file not found: {input_path}")
-                continue
-
-            hb = HandBrakeHandler(input_file=input_path)
-            progress = self.rip_window.start_transcode_progress(title['row_index'])
-            try:
-                hb.transcode(output_path, progress_widget=progress)
-                try:
-                    db = RippingDatabase()
-                    db.mark_transcoded(output_path)
-                except Exception as e:
-                    self.logger.warning(f"Could not mark file as transcoded: {e}")
-                if Config.get("Delete Original After Transcode"):
-                    try:
-                        os.remove(input_path)
-                        self.logger.info(f"Deleted original file: {input_path}")
-                    except Exception as e:
-                        self.logger.warning(f"Could not delete original file: {input_path} — {e}")
-            except Exception as e:
-                self.logger.error(f"Failed to transcode {input_path}: {e}")
-                messagebox.showerror("Error", f"Failed to transcode {input_path}:\n{e}")
-                progress.config(style="red.Horizontal.TProgressbar")
-        self.toolbar.btn_rip.config(state=tk.NORMAL)
+    def on_stop_rip(self):
+        """Cancel every running and queued rip and transcode."""
+        supervisor = JobSupervisor.default()
+        if not supervisor.active_jobs():
+            messagebox.showinfo("Rip", "Nothing is being ripped or transcoded.")
+            return
+        if messagebox.askyesno("Stop Rip", "Cancel all running and queued rips and transcodes?"):
+            count = supervisor.cancel_all()
+            self.status_var.set(f"Cancelled {count} job(s).")
+
+    def on_cancel_selected(self):
+        """Cancel the rip and transcode of the titles checked in the current tab."""
+        supervisor = JobSupervisor.default()
+        count = 0
+        for title in self.rip_window.get_selected():
+            for kind in ('rip', 'transcode'):
+                count += supervisor.cancel(self.rip_window.job_id(kind, title['row_index']))
+        self.status_var.set(f"Cancelled {count} job(s).")
+
+    def transcode_title(self, title):
+        """Transcode a single ripped title; called concurrently by the TranscodeStage workers."""
+        transcode_title(title, rip_table=self.rip_window, on_error=lambda input_path, e: self.after(
+            0, lambda: messagebox.showerror("Error", f"Failed to transcode {input_path}:\n{e}")))
+
+    def on_transcode_complete(self):
+        self.after(0, lambda: self.toolbar.btn_rip.config(state=tk.NORMAL))
 
     def open_rip_library(self):
         self.logger.debug("Entered Rip History")
         RipLibraryWindow(self)
     
-    def update_metadata(self, title):
-        """Update the disc/ISO metadata display."""
-        omdb_info = omdb_api().query_omdb(title)
-        if not omdb_info:
-            dlg = SearchDialog(self, initial_title=title)
-            if not dlg.result:
-                return
-            omdb_info = omdb_api().query_omdb(dlg.result["Title"])
-            self.current_title = omdb_info['Title']
-        if omdb_info and omdb_info["Poster"] and omdb_info["Poster"] != "N/A":
-            img = omdb_api().fetch_poster(omdb_info["Poster"])
-            if img:
-                img = img.resize((210, 295))
-                self.poster_img = ImageTk.PhotoImage(img)
-                self.poster.config(image=self.poster_img)
-            else:
-                self.poster.config(image="", text="Poster Not Found", anchor=tk.CENTER)
-            metadata = [
-                omdb_info['Title'],
-                omdb_info['Year'],
-                omdb_info['Plot'],
-                omdb_info['Rated'],
-                omdb_info['Runtime'],
-                omdb_info['Genre'],
-                omdb_info['IMDB']
-            ]
-            self.meta_table.update_data(metadata)
-        else:
-            self.poster.config(image="", text="Poster Not Available", anchor=tk.CENTER)
-        self.media_type = omdb_info["Type"]
-        self.title_year = omdb_info["Year"]
+    def on_clear_negative_cache(self):
+        """Forget titles that OMDB/TVMaze didn't know, so the next load looks them up again."""
+        count = CacheStore.default().clear_negative()
+        self.status_var.set(f"Cleared {count} failed lookup(s).")
 
     def edit_title_metadata(self):
         dlg = SearchDialog(self)
-        if not dlg.result:
-            return
-        omdb_info = omdb_api().query_omdb(dlg.result["Title"])
-        if omdb_info and omdb_info["Poster"] and omdb_info["Poster"] != "N/A":
-            img = omdb_api().fetch_poster(omdb_info["Poster"])
-            if img:
-                img = img.resize((210, 295))
-                self.poster_img = ImageTk.PhotoImage(img)
-                self.poster.config(image=self.poster_img)
-            else:
-                self.poster.config(image="", text="Poster Not Found", anchor=tk.CENTER)
-            title = omdb_info["Title"]
-            plot = omdb_info["Plot"]
-            self.metadata.config(text=f"Title: {title}\nPlot:\n{plot}")
-        else:
-            self.poster.config(image="", text="Poster Not Available", anchor=tk.CENTER)
-        self.media_type = omdb_info["Type"]
-        self.title_year = omdb_info["Year"]
-        self.current_title = title
-        if self.media_type == "series":
-            self.populate_series(title)
-        elif self.media_type == "movie":
-            self.populate_movie(title)
-        # Refresh table rows and comboboxes after editing title
-        self.rip_window.selected_vars.clear()
-        self.rip_window.combobox_vars.clear()
-        self.rip_window.cmb_options = self.options
-        for widget in self.rip_window.inner_frame.winfo_children():
-            widget.destroy()
-        self.rip_window.build_header()
-        self.rip_window.build_rows()
+        if dlg.result:
+            self.load_metadata(dlg.result["Title"], confirmed=True)
     
     def edit_series(self):
+        panel = self.active_panel
         dialog = EpisodeSelectorWizard(self)
         episodes = dialog.selected_episodes
         if not episodes:
             self.logger.error(f"No episodes found")
             messagebox.showerror("Error", f"No episodes found")
             return
-        self.options.clear()
-        for ep in episodes:
-            show = dialog.selected_show['name']
-            year = dialog.selected_show['premiered'][:4] if dialog.selected_show['premiered'] else "Unknown"
-            text = f"{show} ({year}) S{ep['season']:02}E{ep['number']:02} - {ep['name']}"
-            self.options.append(text)
-        
+        # rip_panel() remembers the show and season for the disc, so they must follow the picked episodes
+        panel.show = dialog.selected_show
+        panel.season = min(ep['season'] for ep in episodes)
+        self.fill_series_options(panel, dialog.selected_show, episodes)
+
         # Update the combobox values in the UI
-        self.rip_window.cmb_options = self.options
-        self.rip_window.selected_vars.clear()
-        self.rip_window.combobox_vars.clear()
-        for widget in self.rip_window.inner_frame.winfo_children():
-            widget.destroy()
-        self.rip_window.build_header()
-        self.rip_window.build_rows()
-
-    def guess_title(self, iso_path=None):
-        """Guess the title from the ISO path or disc metadata."""
+        if not panel.is_busy():
+            panel.rip_table.cmb_options = panel.options
+            panel.rip_table.rebuild()
+
+    def guess_title(self, iso_path=None, drive=None, volume_label=None):
+        """Guess the title from the ISO path, a known volume label or the volume label of the disc in the given drive."""
         if iso_path:
             basename = os.path.splitext(os.path.basename(iso_path))[0]
             name = re.sub(r"[_\.]", " ", basename)
@@ -324,20 +409,14 @@ class Application(tk.Tk):
             return name
         else:
             try:
-                result = subprocess.run(
-                    ["wmic", "volume", "where", "DriveLetter='D:'", "get", "Label"],
-                    capture_output=True, text=True, check=True
-                )
-                lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
-                # Find the first line that isn't the header
-                for line in lines:
-                    if line.lower() != "label":
-                        volume_label = line
-                        v_name = re.sub(r"[_\.]", " ", volume_label)
-                        v_name = re.sub(r"\b(SEASON|DISC|VOL|DVD|BLURAY|CD|PART|S\d+|D\d+)\b", " ", v_name, flags=re.IGNORECASE)
-                        v_name = re.sub(r"\b(?:\d{1,2})\b", "", v_name)
-                        v_name = re.sub(r"\s+", " ", v_name).strip()
-                        return v_name
+                if volume_label is None:
+                    volume_label = DiscUtils.get_volume_label(drive or "D:")
+                if volume_label:
+                    v_name = re.sub(r"[_\.]", " ", volume_label)
+                    v_name = re.sub(r"\b(SEASON|DISC|VOL|DVD|BLURAY|CD|PART|S\d+|D\d+)\b", " ", v_name, flags=re.IGNORECASE)
+                    v_name = re.sub(r"\b(?:\d{1,2})\b", "", v_name)
+                    v_name = re.sub(r"\s+", " ", v_name).strip()
+                    return v_name
                 self.logger.warning("Volume label not found.")
                 return ""
             except subprocess.CalledProcessError as e:
@@ -351,44 +430,21 @@ class Application(tk.Tk):
             return int(match.group(1))
         return 1  # fallback
     
-    def populate_series(self, title_name):
-        season = self.extract_season(title_name)
-        results = TVMazeAPI().search_show(title_name)
-        if not results:
-            self.logger.error(f"No series found for {title_name}")
-            messagebox.showerror("Error", f"No series found for {title_name}")
-            return
-        show_id = results[0]['show']['id']
-        show = f"{results[0]['show']['name']}"
-        show_year = f"{results[0]['show']['premiered'][:4]}"
-        episodes = TVMazeAPI().get_episodes(show_id, season)
-        if not episodes:
-            self.logger.error(f"No episodes found for {show} Season {season}")
-            messagebox.showerror("Error", f"No episodes found for {show} Season {season}")
-            return
-        self.options.clear()
+    def fill_series_options(self, panel, show, episodes):
+        show_year = (show.get('premiered') or "")[:4]
+        panel.options.clear()
         for ep in episodes:
-            self.options.append(f"{show} ({show_year}) S{ep['season']:02}E{ep['number']:02} - {ep['name']}")
-
-    def populate_movie(self, title_guess):
-        # Query OMDb API for movie details
-        omdb_info = omdb_api().query_omdb(title_guess)
-        if not omdb_info:
-            self.logger.error("Could not retrieve movie details from OMDb.")
-            messagebox.showerror("Error", "Could not retrieve movie details from OMDb.")
-            return
+            panel.options.append(f"{show['name']} ({show_year}) S{ep['season']:02}E{ep['number']:02} - {ep['name']}")
 
+    def fill_movie_options(self, panel, omdb_info):
         # Format the movie title as "Movie Title (Year Released)"
         movie_title = f"{omdb_info['Title']} ({omdb_info['Year']})"
-
-        # Clear and repopulate self.options with the movie title
-        self.options.clear()
-        self.options.append(movie_title)
-
+        panel.options.clear()
+        panel.options.append(movie_title)
         # Update the comboboxes in the CheckComboTable
-        for i, row in enumerate(self.rows):
-            if i < len(self.rip_window.combobox_vars):
-                self.rip_window.combobox_vars[i].set(movie_title)
+        for i, row in enumerate(panel.rows):
+            if i < len(panel.rip_table.combobox_vars):
+                panel.rip_table.combobox_vars[i].set(movie_title)
 
     def apply_settings(self, new_settings):
         """Apply settings from Preferences dialog."""
@@ -0,0 +1,199 @@
+"""End-to-end throughput benchmark for the scan -> rip -> rename -> transcode -> DB pipeline.
+
+Runs the real handlers, transcode stage, supervisor, watchdog, progress bus
+and database headless, against the simulators in benchmarks/simulators
+(which stand in for makemkvcon and HandBrakeCLI), inside a throwaway working
+directory. Reports jobs per hour, per-stage latency and the rate of UI
+events published to and drained from the progress bus.
+
+    python -m benchmarks.bench_pipeline [--drives N] [--titles N] [--workers N]
+                                        [--scan-seconds S] [--rip-seconds S] [--encode-seconds S]
+                                        [--fps N] [--verbose]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+
+SIMULATOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulators")
+
+
+class HeadlessDisc:
+    """The bits of a DrivePanel that rip_selected() reads from its RipTable's master."""
+    def __init__(self, transcode_stage):
+        self.transcode_stage = transcode_stage
+        self.current_title = "Benchmark Disc"
+        self.media_type = "movie"
+        self.title_year = "2024"
+        self.completed = threading.Event()
+
+    def on_transcode_complete(self):
+        self.completed.set()
+
+
+class HeadlessRipTable:
+    """The bits of RipTable that rip_selected() and the transcode workers use."""
+    def __init__(self, master, drive):
+        self.master = master
+        self.drive = drive
+        self.cancelled = 0
+
+    def job_id(self, kind, row_index):
+        return f"{kind}:bench{self.drive}-{row_index}"
+
+    def start_rip_progress(self, row_index):
+        from views.widgets.riptable import RowProgress
+        return RowProgress(self, row_index, 'rip')  # Publishes to the bus; the UI loop never applies it
+
+    def start_transcode_progress(self, row_index):
+        from views.widgets.riptable import RowProgress
+        return RowProgress(self, row_index, 'transcode')
+
+    def show_cancelled(self, row_index, kind='rip'):
+        self.cancelled += 1
+
+
+class Stats:
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def report(self):
+        print(f"{'stage':<16}{'n':>5}{'mean s':>10}{'p50 s':>10}{'max s':>10}")
+        for stage, values in self.samples.items():
+            print(f"{stage:<16}{len(values):>5}{statistics.mean(values):>10.3f}"
+                  f"{statistics.median(values):>10.3f}{max(values):>10.3f}")
+
+
+def setup_workdir(args):
+    """Run in a scratch directory so the benchmark never touches the real output, cache or database."""
+    workdir = tempfile.mkdtemp(prefix="ripmedia-bench-")
+    for sub in ("logs", "data", "output", "encoded", "cache"):
+        os.makedirs(os.path.join(workdir, sub), exist_ok=True)
+    os.chdir(workdir)
+    os.environ.update({
+        "RIPMEDIA_SIM_DRIVES": str(args.drives),
+        "RIPMEDIA_SIM_SCAN_SECONDS": str(args.scan_seconds),
+        "RIPMEDIA_SIM_RIP_SECONDS": str(args.rip_seconds),
+        "RIPMEDIA_SIM_ENCODE_SECONDS": str(args.encode_seconds),
+    })
+    return workdir
+
+
+def run(args):
+    from config import Config
+    from modules.handlers.makemkv import MakeMKVHandler
+    from modules.jobs.pipeline import TranscodeStage, transcode_title
+    from modules.jobs.progress_bus import ProgressBus
+
+    Config.set('MakeMKV Path', os.path.join(SIMULATOR_DIR, "fake_makemkvcon.py"))
+    Config.set('HandBrake Path', os.path.join(SIMULATOR_DIR, "fake_handbrakecli.py"))
+    Config.set('Output Directory', os.path.abspath("output"))
+    Config.set('Encode Directory', os.path.abspath("encoded"))
+    Config.set('Cache Directory', os.path.abspath("cache"))
+    Config.set('Scan Cache', False)
+
+    stats = Stats()
+    bus = ProgressBus.default()
+
+    class TimedMakeMKVHandler(MakeMKVHandler):
+        def rip(self, *a, **kw):
+            started = time.perf_counter()
+            super().rip(*a, **kw)
+            stats.add("rip", time.perf_counter() - started)
+
+    class TimedTranscodeStage(TranscodeStage):
+        def submit(self, title):
+            title['submitted_at'] = time.perf_counter()
+            return super().submit(title)
+
+    def timed_transcode_title(title):
+        # The application's own transcode_title, minus its error dialogs
+        started = time.perf_counter()
+        stats.add("transcode wait", started - title['submitted_at'])
+        marked = transcode_title(title)
+        if marked is None:
+            return  # Skipped, cancelled or failed: not a completed job
+        stats.add("transcode", time.perf_counter() - started)
+        db_started = time.perf_counter()
+        marked.result()
+        stats.add("db", time.perf_counter() - db_started)
+
+    stop = threading.Event()
+
+    def ui_loop():
+        # Stands in for the Tk event loop draining the bus at the UI frame rate
+        frames = 0
+        while not stop.wait(1.0 / args.fps):
+            bus.drain(apply_updates=False)
+            frames += 1
+
+    ui_thread = threading.Thread(target=ui_loop, daemon=True)
+    ui_thread.start()
+    stage = TimedTranscodeStage(timed_transcode_title, workers=args.workers).start()
+
+    started = time.perf_counter()
+    drives = MakeMKVHandler().list_drives()[:args.drives]
+
+    def run_drive(drive):
+        mkv = TimedMakeMKVHandler(disc_idx=drive['index'])
+        scan_started = time.perf_counter()
+        mkv.scan(use_cache=False).join()
+        stats.add("scan", time.perf_counter() - scan_started)
+        titles = [{'index': r['index'], 'duration': r['duration'], 'title_name': f"Drive{drive['index']} {r['name']} {i}",
+                   'row_index': i} for i, r in enumerate(mkv.scan_results[:args.titles])]
+        disc = HeadlessDisc(stage)
+        table = HeadlessRipTable(disc, drive['index'])
+        thread = mkv.rip_selected(titles, Config.get("Output Directory"), table)
+        if thread:
+            thread.join()
+
+    threads = [threading.Thread(target=run_drive, args=(drive,)) for drive in drives]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    ui_thread.join()
+    bus.drain(apply_updates=False)
+
+    jobs = len(stats.samples.get("db", []))
+    print(f"drives={len(drives)} titles/drive={args.titles} transcode workers={stage.workers} "
+          f"scan={args.scan_seconds}s rip={args.rip_seconds}s encode={args.encode_seconds}s")
+    print(f"completed jobs: {jobs} in {elapsed:.2f}s  ->  {jobs / elapsed * 3600:.0f} jobs/hour")
+    stats.report()
+    print(f"UI events: {bus.published} published ({bus.published / elapsed:.0f}/s), "
+          f"{bus.applied} reached the UI ({bus.applied / elapsed:.1f}/s at {args.fps} fps)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drives", type=int, default=2)
+    parser.add_argument("--titles", type=int, default=3, help="titles ripped per drive")
+    parser.add_argument("--workers", type=int, default=2, help="transcode workers")
+    parser.add_argument("--scan-seconds", type=float, default=1.0)
+    parser.add_argument("--rip-seconds", type=float, default=2.0)
+    parser.add_argument("--encode-seconds", type=float, default=3.0)
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--verbose", action="store_true", help="keep the application's debug logging")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    workdir = setup_workdir(args)
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    print(f"Working directory: {workdir}")
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
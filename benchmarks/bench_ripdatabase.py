@@ -0,0 +1,135 @@
+"""Query latency benchmark for the rip database at library scale.
+
+Seeds a throwaway database with --rips rows (500k by default) spread over
+discs of --titles titles each, then times the queries the application runs
+against it and fails (exit status 1) if any p95 exceeds its budget, or if
+a query stops using its index.
+
+    python -m benchmarks.bench_ripdatabase [--rips N] [--titles N] [--samples N]
+                                           [--recent-ms MS] [--update-ms MS] [--lookup-ms MS] [--search-ms MS]
+"""
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+SEED_BATCH = 10000
+RIP_INTERVAL = timedelta(minutes=10)    # 500k rips span about ten years
+SYLLABLES = ["ka", "lo", "mi", "ren", "sa", "tor", "vel", "dun", "bri", "ost", "pha", "quin", "ze", "hal", "mor"]
+# Title words, so a search matches a realistic slice of the library rather than every row
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES[:4]]
+
+
+def seed(db, rips, titles_per_disc):
+    """Insert discs and rips in large transactions through the database's own writer."""
+    discs = (rips + titles_per_disc - 1) // titles_per_disc
+    start = datetime(2015, 1, 1)
+
+    def insert_discs(conn):
+        conn.executemany("INSERT INTO discs (id, title, type, year, volume_label, disc_key) VALUES (?, ?, ?, ?, ?, ?)",
+                         ((i, f"Disc {i}", "movie", "2000", f"LABEL_{i}", f"disc:LABEL_{i}:{i}")
+                          for i in range(1, discs + 1)))
+
+    db._write(insert_discs).result()
+    for first in range(0, rips, SEED_BATCH):
+        rows = [((i // titles_per_disc) + 1, i % titles_per_disc, f"{WORDS[i % len(WORDS)]} {WORDS[i * 7 % len(WORDS)]} {i}",
+                 5400, f"/library/{i}.mkv", i % 2, (start + i * RIP_INTERVAL).strftime("%Y-%m-%d %H:%M:%S"))
+                for i in range(first, min(rips, first + SEED_BATCH))]
+        db._write(lambda conn, rows=rows: conn.executemany(
+            "INSERT INTO rips (disc_id, title_index, title_name, duration, output_path, transcoded, ripped_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)).result()
+    return discs
+
+
+def timed(func, samples):
+    times = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95) - 1], times[-1]
+
+
+def uses_index(db, sql, params):
+    plan = " ".join(row[-1] for row in db.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    return "USING INDEX" in plan or "USING INTEGER PRIMARY KEY" in plan or "USING COVERING INDEX" in plan
+
+
+def run(args):
+    from data.ripdatabase import RippingDatabase
+
+    db = RippingDatabase(os.path.abspath("rips.db"))
+    started = time.perf_counter()
+    discs = seed(db, args.rips, args.titles)
+    print(f"Seeded {args.rips} rips on {discs} discs in {time.perf_counter() - started:.1f}s "
+          f"(schema version {db.schema_version()})")
+
+    paths = [f"/library/{random.randrange(args.rips)}.mkv" for _ in range(args.samples)]
+    disc_ids = [random.randrange(1, discs + 1) for _ in range(args.samples)]
+    keys = [f"disc:LABEL_{i}:{i}" for i in disc_ids]
+    deep_cursor = None
+    for _ in range(50):
+        deep_cursor = db.query_rips(after=deep_cursor, limit=100)[1]
+    checks = [
+        ("list_recent_rips(25)", args.recent_ms, lambda: db.list_recent_rips(25),
+         "SELECT r.title_name FROM rips r JOIN discs d ON r.disc_id = d.id ORDER BY r.ripped_at DESC LIMIT 25", ()),
+        ("mark_transcoded", args.update_ms, lambda: db.mark_transcoded(paths.pop()).result(),
+         "UPDATE rips SET transcoded = 1 WHERE output_path = ?", ("x",)),
+        ("rips of a disc", args.lookup_ms,
+         lambda: db.conn.execute("SELECT id FROM rips WHERE disc_id = ?", (disc_ids.pop(),)).fetchall(),
+         "SELECT id FROM rips WHERE disc_id = ?", (1,)),
+        ("search (full text)", args.search_ms,
+         lambda: db.query_rips(search=random.choice(WORDS)[:4]), None, None),
+        ("page 50 of the library", args.search_ms, lambda: db.query_rips(after=deep_cursor, limit=100), None, None),
+        ("filtered page", args.search_ms,
+         lambda: db.query_rips(transcoded=False, date_from="2015-06-01", date_to="2015-06-30", sort="title"), None, None),
+        ("disc by key", args.lookup_ms,
+         lambda: db.conn.execute("SELECT id FROM discs WHERE disc_key = ?", (keys.pop(),)).fetchone(),
+         "SELECT id FROM discs WHERE disc_key = ?", ("x",)),
+    ]
+
+    failures = []
+    print(f"{'query':<24}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'budget':>10}  index")
+    for name, budget, func, sql, params in checks:
+        p50, p95, worst = timed(func, args.samples)
+        indexed = sql is None or uses_index(db, sql, params)
+        print(f"{name:<24}{p50:>10.3f}{p95:>10.3f}{worst:>10.3f}{budget:>10.1f}  {'yes' if indexed else 'NO'}")
+        if p95 > budget:
+            failures.append(f"{name}: p95 {p95:.2f} ms exceeds {budget} ms")
+        if not indexed:
+            failures.append(f"{name}: query plan does not use an index")
+    db.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rips", type=int, default=500000)
+    parser.add_argument("--titles", type=int, default=20, help="rips per disc")
+    parser.add_argument("--samples", type=int, default=200, help="timed runs of each query")
+    parser.add_argument("--recent-ms", type=float, default=5.0, help="p95 budget for the rip library query")
+    parser.add_argument("--update-ms", type=float, default=50.0, help="p95 budget for mark_transcoded, commit included")
+    parser.add_argument("--lookup-ms", type=float, default=2.0, help="p95 budget for indexed lookups")
+    parser.add_argument("--search-ms", type=float, default=20.0, help="p95 budget for a page of the rip library")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    workdir = tempfile.mkdtemp(prefix="ripmedia-bench-")
+    os.makedirs(os.path.join(workdir, "logs"), exist_ok=True)
+    os.chdir(workdir)
+    logging.disable(logging.INFO)
+    print(f"Working directory: {workdir}")
+    failures = run(args)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
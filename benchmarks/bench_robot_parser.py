@@ -0,0 +1,83 @@
+"""Micro-benchmark for the makemkvcon robot output parser.
+
+Replays the recorded transcripts in benchmarks/transcripts through the
+legacy regex parser and RobotOutputParser and reports lines per second.
+
+    python -m benchmarks.bench_robot_parser [--repeat N] [transcript ...]
+"""
+import os, re
+import io
+import glob
+import time
+import argparse
+
+from modules.handlers.robot_parser import RobotOutputParser
+
+TRANSCRIPT_DIR = os.path.join(os.path.dirname(__file__), "transcripts")
+
+
+class LegacyRegexParser:
+    """The per-line regex cascade MakeMKVHandler used before RobotOutputParser."""
+    def __init__(self):
+        self._scan_dict = {}
+        self.scan_results = []
+        self.current_prgt = ""
+        self.current_prgc = ""
+
+    def _emit_progress(self, title, message, percent=None):
+        pass
+
+    def parse_stream(self, stream):
+        for line in io.TextIOWrapper(stream, encoding="utf-8"):
+            self._parse_output(line.strip())
+
+    def _parse_output(self, line):
+        if match := re.match(r'^PRGT:\d+,\d+,"(.+)"', line):
+            self.current_prgt = match.group(1)
+            self._emit_progress(self.current_prgt, self.current_prgc or "")
+        elif match := re.match(r'^PRGC:\d+,\d+,"(.+)"', line):
+            self.current_prgc = match.group(1)
+            self._emit_progress(self.current_prgt or "", self.current_prgc)
+        elif match := re.match(r'^PRGV:(\d+),(\d+),(\d+)', line):
+            completed, _, total = map(int, match.groups())
+            percent = int((completed / total) * 100) if total > 0 else 0
+            self._emit_progress(self.current_prgt or "", self.current_prgc or "", percent)
+        elif match := re.match(r'^MSG:\d+,.+,"(.+)"', line):
+            self._emit_progress(self.current_prgt or "", match.group(1))
+        elif match := re.match(r'TINFO:(\d+),(\d+),\d+,"(.*)"', line):
+            title_idx = int(match.group(1))
+            fields = self._scan_dict.setdefault(title_idx, {})
+            fields[int(match.group(2))] = match.group(3).strip()
+            if 9 in fields and 27 in fields and not any(r['index'] == title_idx for r in self.scan_results):
+                self.scan_results.append({'index': title_idx, 'duration': fields[9], 'name': fields[27]})
+
+
+def run(parser_cls, data, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parser = parser_cls()
+        parser.parse_stream(io.BufferedReader(io.BytesIO(data), RobotOutputParser.READ_BUFFER_SIZE))
+    return time.perf_counter() - start, parser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("transcripts", nargs="*", help="Recorded robot output files (default: bundled transcripts)")
+    arg_parser.add_argument("--repeat", type=int, default=20, help="Times each transcript is replayed")
+    args = arg_parser.parse_args()
+
+    paths = args.transcripts or sorted(glob.glob(os.path.join(TRANSCRIPT_DIR, "*.txt")))
+    print(f"{'transcript':<24}{'lines':>8}{'legacy l/s':>14}{'new l/s':>14}{'speedup':>9}{'titles':>8}")
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        lines = data.count(b"\n") * args.repeat
+        legacy_time, legacy = run(LegacyRegexParser, data, args.repeat)
+        new_time, new = run(RobotOutputParser, data, args.repeat)
+        assert [r['index'] for r in legacy.scan_results] == [r['index'] for r in new.scan_results]
+        print(f"{os.path.basename(path):<24}{lines:>8}{lines / legacy_time:>14,.0f}{lines / new_time:>14,.0f}"
+              f"{legacy_time / new_time:>8.1f}x{len(new.scan_results):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Stand-in for HandBrakeCLI that prints HandBrake-style progress and writes a dummy output.
+
+    fake_handbrakecli.py --preset-import-file F -Z PRESET -i INPUT -o OUTPUT [--encopts ...]
+
+Environment variables:
+
+    RIPMEDIA_SIM_ENCODE_SECONDS   duration of an encode (default 2.0)
+    RIPMEDIA_SIM_ENCODE_STEPS     progress lines printed per encode (default 200)
+    RIPMEDIA_SIM_STALL_AT         fraction of an encode after which output stops
+"""
+import os
+import sys
+import time
+
+
+def env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def option(argv, name):
+    return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else None
+
+
+def main(argv):
+    input_path, output_path = option(argv, "-i"), option(argv, "-o")
+    if not input_path or not output_path:
+        sys.stderr.write("usage: fake_handbrakecli.py -i INPUT -o OUTPUT\n")
+        return 2
+    if not os.path.exists(input_path):
+        sys.stdout.write(f"Opening {input_path}...\nNo title found.\n")
+        return 3
+
+    seconds = env_float("RIPMEDIA_SIM_ENCODE_SECONDS", 2.0)
+    steps = max(1, int(env_float("RIPMEDIA_SIM_ENCODE_STEPS", 200)))
+    stall_at = os.environ.get("RIPMEDIA_SIM_STALL_AT")
+    out = sys.stdout
+    out.write(f"[00:00:00] hb_init: starting libhb thread\nOpening {input_path}...\n")
+    start = time.monotonic()
+    for step in range(steps + 1):
+        if stall_at and step >= steps * float(stall_at):
+            out.flush()
+            while True:
+                time.sleep(60)
+        out.write(f"Encoding: task 1 of 1, {100.0 * step / steps:.2f} % (120.00 fps, avg 118.00 fps, ETA 00h00m01s)\r")
+        out.flush()
+        ahead = start + seconds * step / steps - time.monotonic()
+        if ahead > 0:
+            time.sleep(ahead)
+    out.write("\nEncode done!\n")
+    out.flush()
+    with open(input_path, "rb") as src, open(output_path, "wb") as dst:
+        dst.write(src.read(1 << 16))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
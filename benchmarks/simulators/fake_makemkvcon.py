@@ -0,0 +1,96 @@
+"""Stand-in for makemkvcon that replays recorded robot-mode transcripts.
+
+Understands the invocations MakeMKVHandler makes:
+
+    fake_makemkvcon.py -r [options] info disc:9999      -> DRV list
+    fake_makemkvcon.py -r [options] info disc:N|iso:P   -> replays transcripts/bluray_info.txt
+    fake_makemkvcon.py -r [options] mkv disc:N|iso:P T DIR
+                                                        -> replays transcripts/bluray_rip.txt and
+                                                           writes DIR/title_tNN.mkv
+
+Timing and output are controlled through environment variables:
+
+    RIPMEDIA_SIM_SCAN_SECONDS   duration of an info scan (default 1.0)
+    RIPMEDIA_SIM_RIP_SECONDS    duration of a title rip (default 2.0)
+    RIPMEDIA_SIM_FILE_BYTES     size of the dummy MKV written per title (default 1 MiB)
+    RIPMEDIA_SIM_DRIVES         number of drives reported, each with a disc (default 1)
+    RIPMEDIA_SIM_STALL_AT       fraction of a rip after which output stops (e.g. 0.5)
+    RIPMEDIA_SIM_TRANSCRIPTS    directory holding the transcripts to replay
+"""
+import os
+import sys
+import time
+
+TRANSCRIPT_DIR = os.environ.get("RIPMEDIA_SIM_TRANSCRIPTS",
+                                os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "transcripts"))
+
+
+def env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def replay(path, seconds, stall_at=None):
+    """Write a transcript to stdout, spreading it evenly over the given number of seconds."""
+    with open(path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    out = sys.stdout.buffer
+    start = time.monotonic()
+    total = len(lines)
+    for i, line in enumerate(lines):
+        if stall_at is not None and i >= total * stall_at:
+            out.flush()
+            while True:         # Hang like a drive stuck on a scratch until killed
+                time.sleep(60)
+        out.write(line)
+        ahead = start + seconds * i / total - time.monotonic()
+        if ahead > 0.005:
+            out.flush()
+            time.sleep(ahead)
+    out.flush()
+
+
+def list_drives(count):
+    out = sys.stdout
+    for i in range(count):
+        out.write(f'DRV:{i},2,999,12,"BD-RE SIMULATED DRIVE {i}","SIM_DISC_{i}","SIM{i}:"\n')
+    for i in range(count, 16):
+        out.write(f'DRV:{i},256,999,0,"","",""\n')
+    out.flush()
+
+
+def main(argv):
+    args = [a for a in argv if not a.startswith("-")]
+    if not args:
+        sys.stderr.write("usage: fake_makemkvcon.py -r info|mkv SOURCE [TITLE DIR]\n")
+        return 2
+    command, source = args[0], args[1] if len(args) > 1 else ""
+    if source.startswith("iso:") and not os.path.exists(source[4:]):
+        sys.stdout.write(f'MSG:5010,0,1,"Failed to open disc","Failed to open disc"\n')
+        return 1
+
+    if command == "info":
+        if source == "disc:9999":
+            list_drives(int(env_float("RIPMEDIA_SIM_DRIVES", 1)))
+        else:
+            replay(os.path.join(TRANSCRIPT_DIR, "bluray_info.txt"), env_float("RIPMEDIA_SIM_SCAN_SECONDS", 1.0))
+        return 0
+
+    if command == "mkv":
+        title, output_dir = int(args[2]), args[3]
+        stall_at = os.environ.get("RIPMEDIA_SIM_STALL_AT")
+        replay(os.path.join(TRANSCRIPT_DIR, "bluray_rip.txt"), env_float("RIPMEDIA_SIM_RIP_SECONDS", 2.0),
+               float(stall_at) if stall_at else None)
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, f"title_t{title:02}.mkv"), "wb") as f:
+            f.truncate(int(env_float("RIPMEDIA_SIM_FILE_BYTES", 1 << 20)))
+        return 0
+
+    sys.stderr.write(f"unsupported command: {command}\n")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -6,9 +6,17 @@ class Config:
     SETTINGS_CATEGORIES = {
         'General': ['OMDB API Key'],
         'Paths': ['Output Directory', 'Cache Directory'],
-        'Ripping': ['MakeMKV Path', 'Delete Original After Transcode'],
-        'Transcoding': ['HandBrake Path', 'HB Presets File', 'HandBrake Presets'],
-        'User Interface': ['Theme', 'Primary Color', 'Accent Color']
+        'Ripping': ['MakeMKV Path', 'Delete Original After Transcode', 'Scan Cache', 'Revalidate Cached Scans'],
+        'Transcoding': ['HandBrake Path', 'HB Presets File', 'HandBrake Presets', 'Transcode Workers', 'HandBrake Threads'],
+        'Watchdog': ['Stall Timeout', 'Job Timeout', 'Stall Action', 'Stall Retries', 'Stall Notify'],
+        'Metadata': ['OMDB Cache Days', 'TVMaze Cache Days', 'Negative Cache Hours', 'Metadata Cache Entries', 'Poster Cache MB',
+                     'HTTP Timeout', 'HTTP Retries', 'OMDB Rate Limit', 'TVMaze Rate Limit', 'Title Match Confidence'],
+        'User Interface': ['Theme', 'Primary Color', 'Accent Color', 'UI Refresh Rate']
+    }
+
+    # Settings edited with a read-only combobox in Preferences
+    CHOICES = {
+        'Stall Action': ['retry', 'fail'],     # See ProcessWatchdog.ACTIONS
     }
 
     PRESET_THEMES = {
@@ -39,9 +47,29 @@ class Config:
         'HB Presets File': './data/presets.json',
         'HandBrake Presets': 'Fast 1080p30',
         'Delete Original After Transcode': False,
+        'Scan Cache': True,
+        'Revalidate Cached Scans': False,
+        'Transcode Workers': 0,     # 0 = derive from the CPU core count
+        'HandBrake Threads': 0,     # 0 = let HandBrake decide
+        'Stall Timeout': 300,       # Seconds without progress before a child counts as stalled
+        'Job Timeout': 0,           # Seconds a single rip/transcode may run; 0 = no limit
+        'Stall Action': 'retry',
+        'Stall Retries': 1,
+        'Stall Notify': False,      # Show an error dialog for a title that failed on a stall
+        'OMDB Cache Days': 30,      # 0 = keep forever
+        'TVMaze Cache Days': 7,     # Episode lists change while a season airs
+        'Negative Cache Hours': 24,  # How long a title that wasn't found is remembered; 0 = never
+        'Metadata Cache Entries': 20000,
+        'Poster Cache MB': 200,
+        'HTTP Timeout': 10,         # Seconds to wait for a metadata/poster server
+        'HTTP Retries': 3,
+        'OMDB Rate Limit': '1000/86400',    # Calls/seconds allowed by the API plan (free tier: 1000 a day)
+        'TVMaze Rate Limit': '20/10',
+        'Title Match Confidence': 70,   # % similarity needed to use a fuzzy title match without asking
         'Theme': 'Default',
         'Primary Color': "#3498db",
         'Accent Color': '#00ff00',
+        'UI Refresh Rate': 10,      # Progress updates applied per second
     }
 
     _config_file = "data/settings.yaml"
@@ -77,6 +105,14 @@ class Config:
     def get(cls, key):
         return cls._data.get(key, "")
 
+    @classmethod
+    def get_int(cls, key, default=0):
+        """Return a numeric setting; values edited in Preferences come back as strings."""
+        try:
+            return int(cls._data.get(key, default) or default)
+        except (TypeError, ValueError):
+            return default
+
     @classmethod
     def set(cls, key, value):
         cls._data[key] = value
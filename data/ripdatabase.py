@@ -1,20 +1,35 @@
 import os
+import sys
+import json
+import queue
+import atexit
 import sqlite3
+import threading
+import argparse
+from concurrent.futures import Future
 
 from utils import Logger
 
 class RippingDatabase:
-    def __init__(self, db_path="data/rips.db"):
-        self.logger = Logger.get_logger(__name__)
-        self.db_path = db_path
-        dir_path = os.path.dirname(os.path.abspath(db_path))
-        os.makedirs(dir_path, exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path)
-        self.create_tables()
+    """Rip history, stall events and learned titles, shared by the UI and every job worker.
 
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute("""
+    There is one instance per process (default()). All writes go through a
+    queue to a single writer thread, which commits whatever has queued up
+    in one transaction, so concurrent rips and transcodes never fight over
+    the write lock. Each write runs in its own savepoint, so one failing
+    statement doesn't lose the rest of its batch. Write methods return a
+    Future; readers get their own per-thread connections, which WAL mode
+    lets run alongside the writer.
+    """
+    BATCH_SIZE = 100            # Writes committed together at most
+    BUSY_TIMEOUT = 30
+    MERGE_WINDOW = 3 * 3600     # compact(): longest gap between two titles ripped from the same disc
+    # Schema changes, applied in order on startup and recorded in schema_version.
+    # Never edit a released migration; append a new one.
+    MIGRATIONS = [
+        # 1: the tables as they were before versioning (IF NOT EXISTS, so existing databases adopt it)
+        [
+            """
             CREATE TABLE IF NOT EXISTS discs (
                 id INTEGER PRIMARY KEY,
                 title TEXT,
@@ -24,8 +39,8 @@ class RippingDatabase:
                 metadata TEXT,
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP
             )
-        """)
-        cursor.execute("""
+            """,
+            """
             CREATE TABLE IF NOT EXISTS rips (
                 id INTEGER PRIMARY KEY,
                 disc_id INTEGER,
@@ -37,25 +52,252 @@ class RippingDatabase:
                 ripped_at TEXT DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY(disc_id) REFERENCES discs(id)
             )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS stall_events (
+                id INTEGER PRIMARY KEY,
+                job_id TEXT,
+                kind TEXT,
+                reason TEXT,
+                elapsed INTEGER,
+                action TEXT,
+                occurred_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS learned_titles (
+                disc_key TEXT PRIMARY KEY,
+                title TEXT,
+                imdb_id TEXT,
+                type TEXT,
+                year TEXT,
+                season INTEGER,
+                metadata TEXT,
+                show TEXT,
+                confirmed_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ],
+        # 2: indexes for mark_transcoded and list_recent_rips, and a unique key per physical disc
+        [
+            "CREATE INDEX IF NOT EXISTS idx_rips_output_path ON rips (output_path)",
+            "CREATE INDEX IF NOT EXISTS idx_rips_ripped_at ON rips (ripped_at)",
+            "CREATE INDEX IF NOT EXISTS idx_rips_disc_id ON rips (disc_id)",
+            "ALTER TABLE discs ADD COLUMN disc_key TEXT",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_discs_key ON discs (disc_key)",
+        ],
+        # 3: full-text search over the rip library (rowid = rips.id), kept in step by triggers
+        [
+            "CREATE INDEX IF NOT EXISTS idx_rips_title_name ON rips (title_name)",
+            "CREATE VIRTUAL TABLE rips_fts USING fts5(title_name, disc_title, output_path, prefix='2 3')",
+            """
+            INSERT INTO rips_fts (rowid, title_name, disc_title, output_path)
+            SELECT r.id, r.title_name, d.title, r.output_path FROM rips r LEFT JOIN discs d ON r.disc_id = d.id
+            """,
+            """
+            CREATE TRIGGER rips_fts_insert AFTER INSERT ON rips BEGIN
+                INSERT INTO rips_fts (rowid, title_name, disc_title, output_path)
+                VALUES (new.id, new.title_name, (SELECT title FROM discs WHERE id = new.disc_id), new.output_path);
+            END
+            """,
+            """
+            CREATE TRIGGER rips_fts_delete AFTER DELETE ON rips BEGIN
+                DELETE FROM rips_fts WHERE rowid = old.id;
+            END
+            """,
+            """
+            CREATE TRIGGER rips_fts_update AFTER UPDATE OF title_name, output_path, disc_id ON rips BEGIN
+                DELETE FROM rips_fts WHERE rowid = old.id;
+                INSERT INTO rips_fts (rowid, title_name, disc_title, output_path)
+                VALUES (new.id, new.title_name, (SELECT title FROM discs WHERE id = new.disc_id), new.output_path);
+            END
+            """,
+            """
+            CREATE TRIGGER rips_fts_disc_title AFTER UPDATE OF title ON discs BEGIN
+                DELETE FROM rips_fts WHERE rowid IN (SELECT id FROM rips WHERE disc_id = new.id);
+                INSERT INTO rips_fts (rowid, title_name, disc_title, output_path)
+                SELECT id, title_name, new.title, output_path FROM rips WHERE disc_id = new.id;
+            END
+            """,
+        ],
+    ]
+    SORTS = ('ripped_at', 'title')     # query_rips() sort orders
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, db_path="data/rips.db"):
+        self.logger = Logger.get_logger(__name__)
+        self.db_path = db_path
+        dir_path = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(dir_path, exist_ok=True)
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()    # Nothing is queued behind close()'s sentinel
+        self._writer_conn = self._connect()
+        self._writer_conn.execute("PRAGMA journal_mode=WAL")
+        self.migrate()
+        self._writer = threading.Thread(target=self._write_loop, name="ripdatabase-writer", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def default(cls):
+        """The process-wide database service; pending writes are flushed at exit."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                atexit.register(cls._default.close)
+            return cls._default
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def conn(self):
+        """This thread's read connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def _write(self, func):
+        """Queue func(conn) for the writer thread; the Future gets its return value."""
+        future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot write to a closed database")
+            self._queue.put((func, future))
+        return future
+
+    def _execute(self, sql, params=()):
+        return self._write(lambda conn: conn.execute(sql, params).lastrowid)
+
+    def _write_loop(self):
+        conn = self._writer_conn
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            batch = [item for item in batch if item is not None]
+            if not batch:
+                continue
+            results = []
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for func, future in batch:
+                    conn.execute("SAVEPOINT write")
+                    try:
+                        results.append((future, func(conn), None))
+                        conn.execute("RELEASE write")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write")
+                        conn.execute("RELEASE write")
+                        results.append((future, None, e))
+                conn.execute("COMMIT")
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                self.logger.error(f"Database commit of {len(batch)} writes failed: {e}")
+                results = [(future, None, e) for _, future in batch]
+            for future, result, error in results:
+                if error is None:
+                    future.set_result(result)
+                else:
+                    self.logger.warning(f"Database write failed: {error}")
+                    future.set_exception(error)
+
+    def flush(self):
+        """Wait until every write queued so far is committed."""
+        if self._writer.is_alive():
+            self._write(lambda conn: None).result()
+
+    def migrate(self):
+        """Bring the schema up to date; each pending migration runs in its own transaction."""
+        conn = self._writer_conn
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
         """)
-        self.conn.commit()
+        for version, statements in enumerate(self.MIGRATIONS, start=1):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Checked inside the transaction, in case another process is migrating too
+                if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                    conn.execute("ROLLBACK")
+                    continue
+                for sql in statements:
+                    conn.execute(sql)
+                conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self.logger.info(f"Rip database migrated to schema version {version}")
 
-    def add_disc(self, title, media_type, year, volume_label, metadata=""):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO discs (title, type, year, volume_label, metadata)
-            VALUES (?, ?, ?, ?, ?)
-        """, (title, media_type, year, volume_label, metadata))
-        self.conn.commit()
-        return cursor.lastrowid
+    def schema_version(self):
+        return self.conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+    def add_disc(self, title, media_type, year, volume_label, metadata="", disc_key=None):
+        """Insert or update a disc and wait for its id.
+
+        disc_key is the disc's fingerprint (ScanCache.fingerprint_layout); a
+        disc that's already known keeps its row and gets the new details.
+        """
+        def upsert(conn):
+            cursor = conn.execute("""
+                INSERT INTO discs (title, type, year, volume_label, metadata, disc_key)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (disc_key) DO UPDATE SET
+                    title = excluded.title, type = excluded.type, year = excluded.year,
+                    volume_label = excluded.volume_label, metadata = COALESCE(NULLIF(excluded.metadata, ''), metadata)
+            """, (title, media_type, year, volume_label, metadata, disc_key))
+            if disc_key is None:
+                return cursor.lastrowid
+            return conn.execute("SELECT id FROM discs WHERE disc_key = ?", (disc_key,)).fetchone()[0]
+        return self._write(upsert).result()
 
     def add_rip(self, disc_id, title_index, title_name, duration, output_path, transcoded=0):
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        return self._execute("""
             INSERT INTO rips (disc_id, title_index, title_name, duration, output_path, transcoded)
             VALUES (?, ?, ?, ?, ?, ?)
         """, (disc_id, title_index, title_name, duration, output_path, transcoded))
-        self.conn.commit()
+
+    def add_stall_event(self, job_id, kind, reason, elapsed, action):
+        return self._execute("""
+            INSERT INTO stall_events (job_id, kind, reason, elapsed, action)
+            VALUES (?, ?, ?, ?, ?)
+        """, (job_id, kind, reason, elapsed, action))
+
+    def remember_title(self, disc_key, omdb_info, season=None, show=None):
+        """Store the title confirmed for a disc (volume label or ISO fingerprint)."""
+        return self._execute("""
+            INSERT OR REPLACE INTO learned_titles (disc_key, title, imdb_id, type, year, season, metadata, show)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (disc_key, omdb_info.get('Title'), omdb_info.get('IMDB'), omdb_info.get('Type'), omdb_info.get('Year'),
+              season, json.dumps(omdb_info), json.dumps(show) if show else None))
+
+    def learned_title(self, disc_key):
+        """The title previously confirmed for a disc, or None."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT title, season, metadata, show FROM learned_titles WHERE disc_key = ?
+        """, (disc_key,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        title, season, metadata, show = row
+        return {'title': title, 'season': season, 'omdb': json.loads(metadata), 'show': json.loads(show) if show else None}
 
     def list_recent_rips(self, limit=25):
         cursor = self.conn.cursor()
@@ -69,12 +311,141 @@ class RippingDatabase:
         """, (limit,))
         return cursor.fetchall()
 
+    @staticmethod
+    def _match_expression(search):
+        """FTS5 query matching every word of search as a prefix, with the user's quotes and operators neutralised."""
+        words = [word for word in search.replace('"', " ").split() if any(c.isalnum() for c in word)]
+        return " ".join(f'"{word}"*' for word in words)
+
+    def query_rips(self, search="", transcoded=None, date_from=None, date_to=None, sort="ripped_at",
+                   descending=True, after=None, limit=100):
+        """One page of the rip library.
+
+        Rows are (id, title, disc title, output path, ripped at, 'Yes'/'No'
+        transcoded), filtered by a full-text search, transcoded state and an
+        inclusive YYYY-MM-DD date range. Pages are keyset-paginated: pass the
+        returned cursor as after= to get the next page, so every page costs
+        the same however deep into the library it is. The cursor is None on
+        the last page.
+        """
+        if sort not in self.SORTS:
+            raise ValueError(f"Unknown sort order: {sort}")
+        where, params = [], []
+        match = self._match_expression(search or "")
+        if match:
+            # Driven from the FTS table, so it can hand over matches in rowid order and stop after a page
+            tables = "rips_fts f JOIN rips r ON r.id = f.rowid"
+            id_column = "f.rowid"
+            where.append("rips_fts MATCH ?")
+            params.append(match)
+        else:
+            tables = "rips r"
+            id_column = "r.id"
+        # Rips are inserted as they are ripped, so id order is ripped_at order
+        columns = [id_column] if sort == 'ripped_at' else ["r.title_name", id_column]
+        if transcoded is not None:
+            where.append("r.transcoded = ?")
+            params.append(1 if transcoded else 0)
+        if date_from:
+            where.append("r.ripped_at >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("r.ripped_at < date(?, '+1 day')")
+            params.append(date_to)
+        if after:
+            where.append(f"({', '.join(columns)}) {'<' if descending else '>'} ({', '.join('?' * len(columns))})")
+            params.extend(after)
+        order = " DESC" if descending else ""
+        rows = self.conn.execute(f"""
+            SELECT r.id, r.title_name, d.title, r.output_path, r.ripped_at,
+                   CASE r.transcoded WHEN 1 THEN 'Yes' ELSE 'No' END, {", ".join(columns)}
+            FROM {tables}
+            LEFT JOIN discs d ON r.disc_id = d.id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY {", ".join(column + order for column in columns)}
+            LIMIT ?
+        """, (*params, limit)).fetchall()
+        cursor = tuple(rows[-1][6:]) if len(rows) == limit else None
+        return [row[:6] for row in rows], cursor
+
     def mark_transcoded(self, output_path):
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        return self._execute("""
             UPDATE rips SET transcoded = 1 WHERE output_path = ?
         """, (output_path,))
-        self.conn.commit()
+
+    def compact(self, dry_run=False):
+        """Merge the duplicate disc rows left by versions that added one disc per ripped title.
+
+        Unkeyed discs with the same title, type, year and volume label are
+        taken to be one disc while they were created within MERGE_WINDOW of
+        each other and no title index repeats; their rips are moved onto the
+        oldest row and the others are deleted. Returns the number of rows merged.
+        """
+        def merge(conn):
+            rows = conn.execute("""
+                SELECT d.id, d.title, d.type, d.year, d.volume_label, strftime('%s', d.created_at),
+                       GROUP_CONCAT(r.title_index)
+                FROM discs d LEFT JOIN rips r ON r.disc_id = d.id
+                WHERE d.disc_key IS NULL
+                GROUP BY d.id
+                ORDER BY d.title, d.type, d.year, d.volume_label, d.id
+            """).fetchall()
+            merges = {}     # duplicate id -> id kept
+            keep = identity = last_created = None
+            seen = set()
+            for disc_id, title, media_type, year, volume_label, created, title_indexes in rows:
+                indexes = set((title_indexes or "").split(",")) - {""}
+                created = int(created or 0)
+                if ((title, media_type, year, volume_label) != identity or created - last_created > self.MERGE_WINDOW
+                        or indexes & seen):
+                    keep, identity, seen = disc_id, (title, media_type, year, volume_label), set()
+                else:
+                    merges[disc_id] = keep
+                seen |= indexes
+                last_created = created
+            if not dry_run:
+                conn.executemany("UPDATE rips SET disc_id = ? WHERE disc_id = ?",
+                                 [(kept, dup) for dup, kept in merges.items()])
+                conn.executemany("DELETE FROM discs WHERE id = ?", [(dup,) for dup in merges])
+            return len(merges)
+        return self._write(merge).result()
 
     def close(self):
-        self.conn.close()
+        """Commit the queued writes and stop the writer thread."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._writer.is_alive():
+                self._queue.put(None)
+        self._writer.join()
+        # Writes the writer thread never got to (e.g. it died) fail instead of leaving their callers waiting
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(sqlite3.ProgrammingError("Cannot write to a closed database"))
+        self._writer_conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintenance commands for the rip database.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compact = sub.add_parser("compact", help="merge duplicate disc rows (one was added per ripped title)")
+    compact.add_argument("--dry-run", action="store_true", help="only report how many rows would be merged")
+    compact.add_argument("--db", default="data/rips.db")
+    args = parser.parse_args(argv)
+
+    os.makedirs("logs", exist_ok=True)
+    db = RippingDatabase(args.db)
+    try:
+        merged = db.compact(dry_run=args.dry_run)
+    finally:
+        db.close()
+    print(f"{'Would merge' if args.dry_run else 'Merged'} {merged} duplicate disc rows")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+import yaml
+
+from config import Config
+from utils import Logger
+
+class CacheStore:
+    """SQLite-backed key/value store shared by the OMDB and TVMaze caches.
+
+    Entries live in one indexed table keyed by (namespace, key), so a get or
+    set touches a single row instead of rewriting a whole file. Each
+    namespace has its own time-to-live, and the store is trimmed back to
+    'Metadata Cache Entries' by evicting the least recently used entries.
+    Every thread gets its own connection; WAL mode and a busy timeout let
+    several threads and processes share the file.
+
+    A lookup that found nothing is stored as a negative entry (JSON null)
+    with the shorter 'Negative Cache Hours' TTL, so get() distinguishes
+    "known miss" (None) from "not cached" (the default argument).
+
+    Expired entries are not dropped straight away: entry() still returns
+    them, flagged stale, together with the ETag and Last-Modified they were
+    fetched with, so callers can serve them while revalidating. They are
+    evicted once they have been expired for STALE_GRACE.
+    """
+    ACCESS_RESOLUTION = 60      # Seconds between LRU timestamp refreshes of a hot entry
+    EVICT_EVERY = 100           # Sets between size checks
+    BUSY_TIMEOUT = 10
+    STALE_GRACE = 30 * 86400    # Seconds an expired entry is kept to be served stale
+    TTL_SETTINGS = {'omdb': 'OMDB Cache Days', 'tvmaze': 'TVMaze Cache Days'}
+    MISSING = object()          # get() default: nothing cached for this key
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, db_path=None):
+        cache_dir = Config.get('Cache Directory')
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = db_path or os.path.join(cache_dir, "metadata_cache.db")
+        self._local = threading.local()
+        self._sets = 0
+        self._lock = threading.Lock()
+        self.logger = Logger.get_logger(__name__)
+        self._create_tables()
+
+    @classmethod
+    def default(cls):
+        """The process-wide store used by every API cache."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def ttl(namespace):
+        """Seconds an entry in namespace stays fresh; 0 means forever."""
+        setting = CacheStore.TTL_SETTINGS.get(namespace)
+        return Config.get_int(setting) * 86400 if setting else 0
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_tables(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        # Freshness metadata, added after the table was first released
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(entries)")}
+        for column, kind in (("etag", "TEXT"), ("last_modified", "TEXT"), ("fetched_at", "REAL")):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE entries ADD COLUMN {column} {kind}")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS imports (source TEXT PRIMARY KEY, imported_at REAL)")
+
+    @staticmethod
+    def negative_ttl():
+        return Config.get_int('Negative Cache Hours', 24) * 3600
+
+    def get(self, namespace, key, default=None):
+        entry = self.entry(namespace, key)
+        if entry is None or entry['stale']:
+            return default
+        return entry['value']
+
+    def entry(self, namespace, key):
+        """The cached value with its freshness metadata, or None; expired entries are returned with stale=True."""
+        row = self.conn.execute("SELECT value, expires_at, accessed_at, etag, last_modified, fetched_at "
+                                "FROM entries WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at, etag, last_modified, fetched_at = row
+        now = time.time()
+        if now - accessed_at > self.ACCESS_RESOLUTION:
+            self.conn.execute("UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                              (now, namespace, key))
+        return {
+            'value': json.loads(value),
+            'stale': bool(expires_at and expires_at < now),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': fetched_at,
+        }
+
+    def set(self, namespace, key, value, ttl=None, etag=None, last_modified=None):
+        """Store value (anything JSON-serialisable); ttl defaults to the namespace's TTL.
+
+        etag and last_modified are the validators of the response the value
+        came from, used to revalidate it once it goes stale.
+        """
+        now = time.time()
+        ttl = self.ttl(namespace) if ttl is None else ttl
+        self.conn.execute("INSERT OR REPLACE INTO entries (namespace, key, value, expires_at, accessed_at, "
+                          "etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          (namespace, key, json.dumps(value), now + ttl if ttl else None, now,
+                           etag, last_modified, now))
+        with self._lock:
+            self._sets += 1
+            check = self._sets % self.EVICT_EVERY == 0
+        if check:
+            self.evict()
+
+    def values(self, namespace, key_prefix=""):
+        """Yield the unexpired values of a namespace whose keys start with key_prefix."""
+        rows = self.conn.execute("SELECT value FROM entries WHERE namespace = ? AND key >= ? AND key < ? "
+                                 "AND (expires_at IS NULL OR expires_at >= ?)",
+                                 (namespace, key_prefix, key_prefix + "\uffff", time.time())).fetchall()
+        for (value,) in rows:
+            yield json.loads(value)
+
+    def touch(self, namespace, key, ttl=None):
+        """Mark an entry fresh again without rewriting it, e.g. after a 304 Not Modified."""
+        now = time.time()
+        ttl = self.ttl(namespace) if ttl is None else ttl
+        self.conn.execute("UPDATE entries SET expires_at = ?, fetched_at = ? WHERE namespace = ? AND key = ?",
+                          (now + ttl if ttl else None, now, namespace, key))
+
+    def set_negative(self, namespace, key):
+        """Remember that a lookup found nothing, for the shorter negative TTL."""
+        self.set(namespace, key, None, ttl=self.negative_ttl() or -1)
+
+    def clear_negative(self, namespace=None):
+        """Forget cached misses (of one namespace, or all) so they are looked up again."""
+        if namespace:
+            cursor = self.conn.execute("DELETE FROM entries WHERE namespace = ? AND value = 'null'", (namespace,))
+        else:
+            cursor = self.conn.execute("DELETE FROM entries WHERE value = 'null'")
+        return cursor.rowcount
+
+    def delete(self, namespace, key):
+        self.conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def evict(self, max_entries=None):
+        """Drop expired misses and long-expired entries, then the least recently used ones beyond the size limit."""
+        max_entries = Config.get_int('Metadata Cache Entries') if max_entries is None else max_entries
+        now = time.time()
+        self.conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND "
+                          "(expires_at < ? OR (value = 'null' AND expires_at < ?))", (now - self.STALE_GRACE, now))
+        if max_entries:
+            count = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if count > max_entries:
+                self.conn.execute("DELETE FROM entries WHERE rowid IN "
+                                  "(SELECT rowid FROM entries ORDER BY accessed_at LIMIT ?)", (count - max_entries,))
+                self.logger.debug(f"Evicted {count - max_entries} metadata cache entries")
+
+    def import_yaml(self, namespace, yaml_path):
+        """One-time import of a legacy whole-file YAML cache; the file is renamed once imported."""
+        if not os.path.exists(yaml_path):
+            return 0
+        try:
+            with open(yaml_path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            self.logger.warning(f"Could not import {yaml_path}: {e}")
+            return 0
+        now = time.time()
+        ttl = self.ttl(namespace)
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have imported the file while we were reading it
+            if conn.execute("SELECT 1 FROM imports WHERE source = ?", (os.path.abspath(yaml_path),)).fetchone():
+                conn.execute("ROLLBACK")
+                return 0
+            conn.executemany("INSERT OR IGNORE INTO entries (namespace, key, value, expires_at, accessed_at) "
+                             "VALUES (?, ?, ?, ?, ?)",
+                             [(namespace, str(k), json.dumps(v), now + ttl if ttl else None, now)
+                              for k, v in data.items()])
+            conn.execute("INSERT INTO imports (source, imported_at) VALUES (?, ?)", (os.path.abspath(yaml_path), now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        try:
+            os.replace(yaml_path, yaml_path + ".imported")
+        except OSError:
+            pass
+        self.logger.info(f"Imported {len(data)} entries from {yaml_path}")
+        return len(data)
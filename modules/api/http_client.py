@@ -0,0 +1,155 @@
+import json
+import time
+import threading
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+
+import requests
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from utils import Logger
+from modules.api.rate_limiter import TokenBucket
+
+class HttpClient:
+    """Process-wide HTTP client for the metadata APIs and poster downloads.
+
+    One requests.Session with pooled keep-alive connections is shared by
+    every API wrapper, so repeated lookups reuse TCP/TLS connections. All
+    requests get the same timeouts and retry policy. Requests made for a
+    named API go through that API's token bucket; identical concurrent JSON
+    requests share one call, and 429 responses are retried after their
+    Retry-After. Responses are kept by the callers' CacheStore, not here,
+    and revalidated with conditional GETs (revalidate_json).
+    """
+    POOL_SIZE = 10
+    RETRY_STATUSES = [500, 502, 503, 504]
+    RATE_LIMIT_SETTINGS = {'omdb': 'OMDB Rate Limit', 'tvmaze': 'TVMaze Rate Limit'}
+    RATE_LIMIT_RETRIES = 3
+    MAX_RETRY_AFTER = 60    # Longer waits (e.g. an exhausted daily quota) fail instead of blocking a worker
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        self.session = requests.Session()
+        retries = Retry(total=Config.get_int('HTTP Retries', 3), backoff_factor=0.3,
+                        status_forcelist=self.RETRY_STATUSES, allowed_methods=["GET", "HEAD"])
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._inflight = {}
+        self._limiters = {}
+        self._lock = threading.Lock()
+        self.logger = Logger.get_logger(__name__)
+
+    @classmethod
+    def default(cls):
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def timeout():
+        """(connect, read) timeout in seconds, so a hung server can't hang the caller."""
+        read_timeout = Config.get_int('HTTP Timeout', 10) or 10
+        return (min(5, read_timeout), read_timeout)
+
+    @staticmethod
+    def _request_key(url, params):
+        return url, json.dumps(params or {}, sort_keys=True)
+
+    def limiter(self, api):
+        """The shared token bucket for an API, or None if it has no configured limit."""
+        if api not in self.RATE_LIMIT_SETTINGS:
+            return None
+        with self._lock:
+            if api not in self._limiters:
+                self._limiters[api] = TokenBucket.from_setting(Config.get(self.RATE_LIMIT_SETTINGS[api]))
+            return self._limiters[api]
+
+    @staticmethod
+    def retry_after(response, attempt):
+        """Seconds to wait before retrying a 429, from its Retry-After header (seconds or HTTP date)."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return 2 ** attempt
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 2 ** attempt
+
+    def get(self, url, params=None, stream=False, api=None, headers=None):
+        """GET url; raises requests.RequestException on connection errors and HTTP error statuses."""
+        limiter = self.limiter(api)
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            if limiter:
+                limiter.acquire()
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout(), stream=stream)
+            if response.status_code != 429 or attempt == self.RATE_LIMIT_RETRIES:
+                break
+            delay = self.retry_after(response, attempt)
+            if delay > self.MAX_RETRY_AFTER:
+                break
+            self.logger.warning(f"Rate limited by {api or url}; retrying in {delay:.1f}s")
+            if limiter:
+                limiter.pause(delay)  # Holds back every thread using this API, not just this one
+            else:
+                time.sleep(delay)
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def validators(response):
+        """(ETag, Last-Modified) of a response, for revalidating it later."""
+        return response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+    def get_json(self, url, params=None, api=None, with_validators=False):
+        """GET url and decode the JSON body; with_validators=True returns (data, etag, last_modified).
+
+        A request identical to one already in flight waits for that call instead of making its own.
+        """
+        key = self._request_key(url, params)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+        if not leader:
+            result = flight.result()
+            return result if with_validators else result[0]
+        try:
+            response = self.get(url, params, api=api)
+            data = (response.json(), *self.validators(response))
+        except Exception as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        flight.set_result(data)
+        return data if with_validators else data[0]
+
+    def revalidate_json(self, url, params=None, etag=None, last_modified=None, api=None):
+        """Conditional GET of a cached JSON response.
+
+        Returns (data, etag, last_modified); data is None when the server
+        answered 304 Not Modified, i.e. the cached copy is still current.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        response = self.get(url, params, api=api, headers=headers)
+        if response.status_code == 304:
+            return None, etag, last_modified
+        return (response.json(), *self.validators(response))
+
+    def get_bytes(self, url, api=None):
+        return self.get(url, api=api).content
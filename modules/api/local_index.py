@@ -0,0 +1,270 @@
+import os
+import re
+import csv
+import sys
+import gzip
+import json
+import sqlite3
+import argparse
+import threading
+
+from config import Config
+from utils import Logger
+
+class LocalMetadataIndex:
+    """Offline title database built from bulk dumps, consulted before OMDB and TVMaze.
+
+    IMDb-style title.basics (and optionally title.ratings) TSV files and
+    TVMaze show/episode JSON exports are imported into an indexed SQLite
+    file, so most titles resolve in milliseconds without a network.
+
+        python -m modules.api.local_index imdb title.basics.tsv.gz [--ratings title.ratings.tsv.gz]
+        python -m modules.api.local_index tvmaze shows.json
+    """
+    BATCH_SIZE = 10000
+    IMDB_TYPES = {'movie': 'movie', 'tvMovie': 'movie', 'tvSeries': 'series', 'tvMiniSeries': 'series'}
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(Config.get('Cache Directory'), "local_index.db")
+        self._local = threading.local()
+        self.logger = Logger.get_logger(__name__)
+
+    @classmethod
+    def default(cls):
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @property
+    def available(self):
+        """Only look anything up once a dump has been imported."""
+        return os.path.exists(self.db_path)
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._create_tables(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _create_tables(conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS titles (
+                imdb_id TEXT PRIMARY KEY,
+                type TEXT,
+                title TEXT,
+                norm_title TEXT,
+                year TEXT,
+                runtime INTEGER,
+                genres TEXT,
+                votes INTEGER DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_titles_norm ON titles (norm_title);
+            CREATE INDEX IF NOT EXISTS idx_titles_votes ON titles (votes);
+            CREATE TABLE IF NOT EXISTS shows (
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                norm_name TEXT,
+                premiered TEXT,
+                payload TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_shows_norm ON shows (norm_name);
+            CREATE TABLE IF NOT EXISTS episodes (
+                show_id INTEGER,
+                season INTEGER,
+                number INTEGER,
+                payload TEXT,
+                PRIMARY KEY (show_id, season, number)
+            );
+        """)
+
+    @staticmethod
+    def normalize(title):
+        """Lower-case, punctuation-free form used as the lookup key."""
+        return re.sub(r"\s+", " ", re.sub(r"[^0-9a-z]+", " ", (title or "").lower())).strip()
+
+    @staticmethod
+    def _open(path):
+        return gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, "r", encoding="utf-8")
+
+    # ----- Import -----
+
+    def import_imdb_basics(self, path):
+        """Import movies and series from an IMDb title.basics TSV (plain or gzipped)."""
+        count = 0
+        batch = []
+        with self._open(path) as f:
+            for row in csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                media_type = self.IMDB_TYPES.get(row.get('titleType'))
+                if not media_type:
+                    continue
+                runtime = row.get('runtimeMinutes')
+                batch.append((row['tconst'], media_type, row['primaryTitle'], self.normalize(row['primaryTitle']),
+                              None if row.get('startYear') == "\\N" else row.get('startYear'),
+                              int(runtime) if runtime and runtime.isdigit() else None,
+                              None if row.get('genres') == "\\N" else row.get('genres')))
+                if len(batch) >= self.BATCH_SIZE:
+                    count += self._insert_titles(batch)
+                    batch = []
+        count += self._insert_titles(batch)
+        self.logger.info(f"Imported {count} titles from {path}")
+        return count
+
+    def _insert_titles(self, batch):
+        # An upsert rather than INSERT OR REPLACE, which would reset the votes of a re-imported title
+        with self.conn:
+            self.conn.executemany("INSERT INTO titles (imdb_id, type, title, norm_title, year, runtime, genres) "
+                                  "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                                  "ON CONFLICT(imdb_id) DO UPDATE SET type = excluded.type, title = excluded.title, "
+                                  "norm_title = excluded.norm_title, year = excluded.year, "
+                                  "runtime = excluded.runtime, genres = excluded.genres", batch)
+        return len(batch)
+
+    def import_imdb_ratings(self, path):
+        """Import vote counts (title.ratings TSV) so the most popular of several same-named titles wins."""
+        count = 0
+        batch = []
+        with self._open(path) as f:
+            for row in csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                batch.append((int(row['numVotes']), row['tconst']))
+                if len(batch) >= self.BATCH_SIZE:
+                    count += self._update_votes(batch)
+                    batch = []
+        count += self._update_votes(batch)
+        return count
+
+    def _update_votes(self, batch):
+        with self.conn:
+            self.conn.executemany("UPDATE titles SET votes = ? WHERE imdb_id = ?", batch)
+        return len(batch)
+
+    def import_tvmaze(self, path):
+        """Import TVMaze shows, with any embedded episodes, from a JSON array or JSON-lines export."""
+        with self._open(path) as f:
+            text = f.read()
+        if text.lstrip().startswith("["):
+            shows = json.loads(text)
+        else:
+            shows = [json.loads(line) for line in text.splitlines() if line.strip()]
+        episodes = []
+        with self.conn:
+            for show in shows:
+                embedded = show.pop('_embedded', {}) or {}
+                self.conn.execute("INSERT OR REPLACE INTO shows (id, name, norm_name, premiered, payload) "
+                                  "VALUES (?, ?, ?, ?, ?)",
+                                  (show['id'], show['name'], self.normalize(show['name']), show.get('premiered'),
+                                   json.dumps(show)))
+                episodes += [(show['id'], ep['season'], ep['number'], json.dumps(ep))
+                             for ep in embedded.get('episodes', []) if ep.get('number') is not None]
+            self.conn.executemany("INSERT OR REPLACE INTO episodes (show_id, season, number, payload) "
+                                  "VALUES (?, ?, ?, ?)", episodes)
+        self.logger.info(f"Imported {len(shows)} shows and {len(episodes)} episodes from {path}")
+        return len(shows)
+
+    # ----- Lookup -----
+
+    def find_title(self, title):
+        """Best local match for an exact (normalised) title, shaped like omdb_api.query_omdb's result."""
+        if not self.available:
+            return None
+        row = self.conn.execute("SELECT imdb_id, type, title, year, runtime, genres FROM titles WHERE norm_title = ? "
+                                "ORDER BY votes DESC LIMIT 1", (self.normalize(title),)).fetchone()
+        if not row:
+            return None
+        imdb_id, media_type, name, year, runtime, genres = row
+        return {
+            "Title": name,
+            "Type": media_type,
+            "Year": year or "",
+            "Rated": "N/A",
+            "Runtime": f"{runtime} min" if runtime else "N/A",
+            "Genre": (genres or "N/A").replace(",", ", "),
+            "Poster": "N/A",
+            "Plot": "N/A",
+            "IMDB": imdb_id
+        }
+
+    def search_titles(self, query, limit=10):
+        """Titles starting with query, shaped like omdb_api.search_omdb's results."""
+        if not self.available:
+            return []
+        prefix = self.normalize(query)
+        if not prefix:
+            return []
+        rows = self.conn.execute("SELECT imdb_id, type, title, year FROM titles WHERE norm_title >= ? AND norm_title < ? "
+                                 "ORDER BY votes DESC LIMIT ?", (prefix, prefix + "\uffff", limit)).fetchall()
+        return [{"Title": name, "Year": year or "", "imdbID": imdb_id, "Type": media_type, "Poster": "N/A"}
+                for imdb_id, media_type, name, year in rows]
+
+    def search_shows(self, query, limit=10):
+        """Shows starting with query, shaped like TVMazeAPI.search_show's results."""
+        if not self.available:
+            return []
+        prefix = self.normalize(query)
+        if not prefix:
+            return []
+        rows = self.conn.execute("SELECT norm_name, payload FROM shows WHERE norm_name >= ? AND norm_name < ? LIMIT ?",
+                                 (prefix, prefix + "\uffff", limit)).fetchall()
+        # Exact matches first, like TVMaze's relevance ordering
+        return [{"score": 1.0 if norm == prefix else 0.5, "show": json.loads(payload)}
+                for norm, payload in sorted(rows, key=lambda r: r[0] != prefix)]
+
+    def popular_titles(self, limit):
+        """(title, type, year, imdb_id) of the most-voted titles, for the fuzzy title matcher."""
+        if not self.available:
+            return []
+        return self.conn.execute("SELECT title, type, year, imdb_id FROM titles ORDER BY votes DESC LIMIT ?",
+                                 (limit,)).fetchall()
+
+    def show_names(self):
+        if not self.available:
+            return []
+        return self.conn.execute("SELECT name, premiered FROM shows").fetchall()
+
+    def show_index(self, show_id):
+        """A TVMazeAPI.get_show_index() result for an imported show, or None if it has no episodes here."""
+        if not self.available:
+            return None
+        rows = self.conn.execute("SELECT season, payload FROM episodes WHERE show_id = ? ORDER BY season, number",
+                                 (show_id,)).fetchall()
+        if not rows:
+            return None
+        episodes = {}
+        for season, payload in rows:
+            ep = json.loads(payload)
+            ep['runtime_seconds'] = (ep.get('runtime') or 42) * 60
+            episodes.setdefault(str(season), []).append(ep)
+        return {'seasons': [{'number': int(season)} for season in episodes], 'episodes': episodes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import bulk metadata dumps into the local index.")
+    sub = parser.add_subparsers(dest="source", required=True)
+    imdb = sub.add_parser("imdb", help="IMDb title.basics TSV (.tsv or .tsv.gz)")
+    imdb.add_argument("basics")
+    imdb.add_argument("--ratings", help="IMDb title.ratings TSV, used to rank same-named titles")
+    tvmaze = sub.add_parser("tvmaze", help="TVMaze shows JSON export (array or JSON lines, optionally with embedded episodes)")
+    tvmaze.add_argument("shows")
+    args = parser.parse_args(argv)
+
+    Config.load()
+    os.makedirs("logs", exist_ok=True)
+    index = LocalMetadataIndex.default()
+    if args.source == "imdb":
+        print(f"Imported {index.import_imdb_basics(args.basics)} titles")
+        if args.ratings:
+            print(f"Imported {index.import_imdb_ratings(args.ratings)} ratings")
+    else:
+        print(f"Imported {index.import_tvmaze(args.shows)} shows")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
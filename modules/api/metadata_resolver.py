@@ -0,0 +1,179 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import Logger
+from modules.api.omdb import omdb_api
+from modules.api.tvmaze import TVMazeAPI
+from modules.api.poster_cache import PosterCache
+from modules.api.title_matcher import TitleMatcher
+from modules.api.http_client import HttpClient
+
+class MetadataResolver:
+    """Resolves a disc title to OMDB details, poster and TVMaze episodes off the Tk thread.
+
+    The guessed title is first replaced by its best fuzzy match among known
+    titles when the match is confident enough. The OMDB query and TVMaze
+    search then run in parallel, followed by the poster
+    and episode list once the media type is known. Identical requests that
+    are already in flight share one Future, so loading several discs with
+    the same title (or re-opening one mid-lookup) costs one set of calls.
+    The caller gets a Future resolving to a single result dict.
+
+    Once a movie is resolved, what the operator is likely to open next is
+    prefetched: the details and posters of the top search results. A
+    series needs nothing more (see _prefetch_related). Prefetches run on a
+    small pool, are capped in number and are skipped while an API's rate
+    limit has little to spare. They are kept apart from the lookups the user waits
+    for, which never join a queued prefetch; one that is already running
+    still shares its HTTP request with a lookup for the same URL.
+    """
+    RESOLVERS = 4
+    FETCHERS = 8
+    PREFETCHERS = 2
+    MAX_PREFETCHES = 16     # Queued or running at once; further prefetches are dropped
+    PREFETCH_RESULTS = 3    # Search results whose details are prefetched for a movie
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        # Resolves wait on fetches, so they get their own pool to avoid starving it
+        self._resolvers = ThreadPoolExecutor(max_workers=self.RESOLVERS, thread_name_prefix="metadata-resolve")
+        self._fetchers = ThreadPoolExecutor(max_workers=self.FETCHERS, thread_name_prefix="metadata-fetch")
+        self._prefetchers = ThreadPoolExecutor(max_workers=self.PREFETCHERS, thread_name_prefix="metadata-prefetch")
+        self._prefetching = 0
+        self._inflight = {}
+        self._lock = threading.RLock()
+        self.logger = Logger.get_logger(__name__)
+
+    @classmethod
+    def default(cls):
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def _submit(self, executor, key, func, *args):
+        """Run func(*args) unless the same key is already in flight; returns the shared Future."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = executor.submit(func, *args)
+                future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def resolve(self, title, season=1, known=None):
+        """Future resolving to a dict with title, guess, confidence, omdb, show, season, episodes, poster and errors.
+
+        known is a RippingDatabase.learned_title() entry; its OMDB details and
+        show are used as they are, so only the poster and episodes are fetched.
+        """
+        return self._submit(self._resolvers, ("resolve", title, season, known is not None),
+                            self._resolve, title, season, known)
+
+    def _fetch(self, key, func, *args):
+        return self._submit(self._fetchers, key, func, *args)
+
+    def _prefetch(self, api, key, func, *args):
+        """Start an optional fetch if the prefetch budget and the API's rate limit allow it.
+
+        Prefetches are in flight under their own keys, so a lookup for the
+        same key runs on the fetcher pool rather than queueing behind them.
+        """
+        limiter = HttpClient.default().limiter(api)
+        if limiter and not limiter.has_spare():
+            return
+        with self._lock:
+            if (key in self._inflight or ("prefetch",) + key in self._inflight
+                    or self._prefetching >= self.MAX_PREFETCHES):
+                return
+            self._prefetching += 1
+        future = self._submit(self._prefetchers, ("prefetch",) + key, func, *args)
+        future.add_done_callback(self._prefetch_done)
+
+    def _prefetch_done(self, future):
+        with self._lock:
+            self._prefetching -= 1
+        if future.exception():
+            self.logger.debug(f"Prefetch failed: {future.exception()}")
+
+    def _prefetch_related(self, result):
+        # Nothing is prefetched for a series: episodes of every season are sliced from one show
+        # index, which _fetch_details has just cached along with the poster, so the next disc or
+        # season of a box set is already a cache read, and nothing in the UI reads show details.
+        info = result['omdb']
+        if info.get("Type") == "movie":
+            self._prefetch("omdb", ("search", result['title']), self._prefetch_search, result['title'])
+
+    def _prefetch_search(self, query):
+        """Warm the caches for the search results the search dialog will show first."""
+        for item in omdb_api().search_omdb(query, show_errors=False)[:self.PREFETCH_RESULTS]:
+            title = item.get("Title")
+            if title:
+                self._prefetch("omdb", ("omdb", title), self._prefetch_title, title)
+
+    def _prefetch_title(self, title):
+        info = omdb_api().query_omdb(title, show_errors=False)
+        if info and info.get("Poster") and info["Poster"] != "N/A":
+            PosterCache.default().get_thumbnail(info["Poster"])
+        return info
+
+    def _resolve(self, title, season, known=None):
+        if known:
+            result = {'title': title, 'guess': title, 'confidence': 1.0, 'omdb': known['omdb'], 'show': known['show'],
+                      'season': season, 'episodes': [], 'poster': None, 'errors': []}
+            self._fetch_details(result)
+            self._prefetch_related(result)
+            return result
+
+        matcher = TitleMatcher.default()
+        match, confidence = matcher.best_match(title)
+        guess = title
+        if match and confidence >= matcher.threshold():
+            title = match
+        result = {'title': title, 'guess': guess, 'confidence': confidence, 'omdb': None, 'show': None,
+                  'season': season, 'episodes': [], 'poster': None, 'errors': []}
+        omdb_future = self._fetch(("omdb", title), lambda: omdb_api().query_omdb(title, show_errors=False))
+        # Searched speculatively; only used if OMDB says the title is a series
+        show_future = self._fetch(("tvmaze-search", title), lambda: TVMazeAPI().search_show(title, show_errors=False))
+
+        info = self._result(omdb_future, result)
+        result['omdb'] = info
+        if not info:
+            # Offer the best candidate, however unsure, as the starting point for a manual search
+            if match:
+                result['title'] = match
+            return result
+        matcher.add(info["Title"], info.get("Type"), info.get("Year"), info.get("IMDB"))
+        if info.get("Type") == "series":
+            shows = self._result(show_future, result)
+            if shows:
+                result['show'] = shows[0]['show']
+        self._fetch_details(result)
+        self._prefetch_related(result)
+        return result
+
+    def _fetch_details(self, result):
+        """Fetch the poster and, for a series, the season's episodes of a resolved title in parallel."""
+        info, season = result['omdb'], result['season']
+        poster_future = None
+        if info.get("Poster") and info["Poster"] != "N/A":
+            poster_future = self._fetch(("poster", info["Poster"]), PosterCache.default().get_thumbnail, info["Poster"])
+        if info.get("Type") == "series" and result['show']:
+            show_id = result['show']['id']
+            result['episodes'] = self._result(
+                self._fetch(("episodes", show_id, season), TVMazeAPI().get_episodes, show_id, season), result) or []
+        if poster_future:
+            result['poster'] = self._result(poster_future, result)
+
+    def _result(self, future, result):
+        try:
+            return future.result()
+        except Exception as e:
+            self.logger.error(f"Metadata lookup for {result['title']} failed: {e}")
+            result['errors'].append(str(e))
+            return None
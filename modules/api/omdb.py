@@ -1,81 +1,90 @@
-import requests
-from io import BytesIO
 from tkinter import messagebox
-from PIL import Image
 
 from config import Config
 from utils import Logger
 from modules.api.omdb_cache import OMDBCache
+from modules.api.cache_store import CacheStore
+from modules.api.local_index import LocalMetadataIndex
+from modules.api.http_client import HttpClient
+from modules.api.revalidator import Revalidator
 
 class omdb_api:
+    BASE_URL = "http://www.omdbapi.com/"
+
     def __init__(self):
         self.omdb_cache = OMDBCache()
+        self.http = HttpClient.default()
+        self.revalidator = Revalidator(self.omdb_cache, "omdb")
         self.logger = Logger.get_logger(__name__)
 
-    def query_omdb(self, title):
-        """Query OMDB API for movie/series information."""
+    def query_omdb(self, title, show_errors=True):
+        """Query OMDB API for movie/series information; show_errors=False for callers off the Tk thread."""
         cache_key = f"query:{title}"
-        cached = self.omdb_cache.get(cache_key)
-        if cached:
-            self.logger.debug(f"OMDB cache hit for {title}")
-            return cached
-        
         params = {
             "apikey": Config.get('OMDB API Key'),
             "t": title
         }
+        cached = self.revalidator.lookup(cache_key, self.BASE_URL, params, self._parse_title)
+        if cached is not CacheStore.MISSING:
+            self.logger.debug(f"OMDB cache hit for {title}" if cached else f"OMDB negative cache hit for {title}")
+            return cached
+        local = LocalMetadataIndex.default().find_title(title)
+        if local:
+            self.logger.debug(f"Local index hit for {title}")
+            return local
+        
         try:
-            response = requests.get("http://www.omdbapi.com/", params=params)
-            data = response.json()
-            if data.get("Response") == "True":
-                result = {
-                    "Title": data.get("Title"),
-                    "Type": data.get("Type"),    # movie or series
-                    "Year": data.get("Year"),
-                    "Rated": data.get("Rated"),
-                    "Runtime": data.get("Runtime"),
-                    "Genre": data.get("Genre"),
-                    "Poster": data.get("Poster"),
-                    "Plot": data.get("Plot"),
-                    "IMDB": data.get("imdbID")
-                }
-                self.omdb_cache.set(cache_key, result)
-                return result
-            else:
-                self.logger.error(f"OMDB Error: {data.get("Error")}")
-                return None
+            return self.revalidator.fetch(cache_key, self.BASE_URL, params, self._parse_title)
         except Exception as e:
             self.logger.error(f"OMDB query failed: {e}")
-            messagebox.showerror("OMDB query failed", f"{e}")
+            if show_errors:
+                messagebox.showerror("OMDB query failed", f"{e}")
             return None
 
-    def fetch_poster(self, poster_url):
-        try:
-            response = requests.get(poster_url)
-            img_data = BytesIO(response.content)
-            return Image.open(img_data)
-        except Exception as e:
-            self.logger.error(f"Failed to fetch poster: {e}")
-            messagebox.showerror("Error", f"Failed to fetch poster:\n{e}")
-            return None
+    def _parse_title(self, data):
+        if data.get("Response") == "True":
+            return {
+                "Title": data.get("Title"),
+                "Type": data.get("Type"),    # movie or series
+                "Year": data.get("Year"),
+                "Rated": data.get("Rated"),
+                "Runtime": data.get("Runtime"),
+                "Genre": data.get("Genre"),
+                "Poster": data.get("Poster"),
+                "Plot": data.get("Plot"),
+                "IMDB": data.get("imdbID")
+            }
+        self.logger.error(f"OMDB Error: {data.get("Error")}")
+        return None if self.is_not_found(data) else Revalidator.NO_STORE
+
+    @staticmethod
+    def is_not_found(data):
+        """OMDB answered, but has no match (as opposed to a key or quota error)."""
+        return "not found" in (data.get("Error") or "").lower()
 
-    def search_omdb(self, query):
+    def search_omdb(self, query, show_errors=True):
         cache_key = f"search:{query}"
-        cached = self.omdb_cache.get(cache_key)
-        if cached:
+        params = {
+            "apikey": Config.get('OMDB API Key'),
+            "s": query
+        }
+        cached = self.revalidator.lookup(cache_key, self.BASE_URL, params, self._parse_search)
+        if cached is not CacheStore.MISSING:
             self.logger.debug(f"OMDB search cache hit for {query}")
-            return cached
+            return cached or []
+        local = LocalMetadataIndex.default().search_titles(query)
+        if local:
+            return local
         
-        url = f"http://www.omdbapi.com/?apikey={Config.get('OMDB API Key')}&s={query}"
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("Response") == "True":
-                results = data.get("Search", [])
-                self.omdb_cache.set(cache_key, results)
-                return results
+            return self.revalidator.fetch(cache_key, self.BASE_URL, params, self._parse_search) or []
         except Exception as e:
             self.logger.error(f"OMDb search failed: {e}")
-            messagebox.showerror("Error", f"OMDB search failed:\n{e}")
+            if show_errors:
+                messagebox.showerror("Error", f"OMDB search failed:\n{e}")
         return []
+
+    def _parse_search(self, data):
+        if data.get("Response") == "True":
+            return data.get("Search", [])
+        return None if self.is_not_found(data) else Revalidator.NO_STORE
@@ -1,27 +1,30 @@
 import os
-import yaml
 
 from config import Config
+from modules.api.cache_store import CacheStore
 
 class OMDBCache:
+    """OMDB responses in the shared metadata cache store."""
+    NAMESPACE = "omdb"
+
     def __init__(self):
-        os.makedirs(Config.get('Cache Directory'), exist_ok=True)
-        self.cache_path = f"{Config.get('Cache Directory')}/omdb_cache.yaml"
-        self.cache = self.load()
-    
-    def load(self):
-        if os.path.exists(self.cache_path):
-            with open(self.cache_path, "r", encoding="utf-8") as f:
-                return yaml.safe_load(f) or {}
-        return {}
-    
-    def save(self):
-        with open(self.cache_path, "w", encoding="utf-8") as f:
-            yaml.dump(self.cache, f, allow_unicode=True)
-    
-    def get(self, key):
-        return self.cache.get(key)
+        self.store = CacheStore.default()
+        self.store.import_yaml(self.NAMESPACE, os.path.join(Config.get('Cache Directory'), "omdb_cache.yaml"))
+
+    def get(self, key, default=None):
+        return self.store.get(self.NAMESPACE, key, default)
+
+    def entry(self, key):
+        return self.store.entry(self.NAMESPACE, key)
     
-    def set(self, key, data):
-        self.cache[key] = data
-        self.save()
+    def set(self, key, data, etag=None, last_modified=None):
+        self.store.set(self.NAMESPACE, key, data, etag=etag, last_modified=last_modified)
+
+    def touch(self, key):
+        self.store.touch(self.NAMESPACE, key)
+
+    def set_negative(self, key):
+        self.store.set_negative(self.NAMESPACE, key)
+
+    def invalidate(self, key):
+        self.store.delete(self.NAMESPACE, key)
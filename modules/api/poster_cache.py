@@ -0,0 +1,107 @@
+import os
+import hashlib
+import threading
+from io import BytesIO
+
+from PIL import Image
+
+from config import Config
+from utils import Logger
+from modules.api.cache_store import CacheStore
+from modules.api.http_client import HttpClient
+
+class PosterCache:
+    """Content-addressed poster store with ready-to-display thumbnails.
+
+    Originals are saved under the SHA-256 of their bytes, next to a
+    thumbnail per display size, and the poster URL -> digest mapping is kept
+    in the metadata cache store. A known poster is therefore a small file
+    read with no network access; a new one is decoded once at reduced scale
+    (JPEG draft mode). The directory is trimmed to 'Poster Cache MB' by
+    least recent use.
+    """
+    NAMESPACE = "posters"
+    SIZE = (210, 295)
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        self.cache_dir = os.path.join(Config.get('Cache Directory'), "posters")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.store = CacheStore.default()
+        self._lock = threading.Lock()
+        self.logger = Logger.get_logger(__name__)
+
+    @classmethod
+    def default(cls):
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def _path(self, digest, size=None):
+        name = f"{digest}_{size[0]}x{size[1]}.jpg" if size else f"{digest}.orig"
+        return os.path.join(self.cache_dir, name)
+
+    @staticmethod
+    def _write(path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get_thumbnail(self, url, size=SIZE):
+        """Return the poster at url as a PIL image of the given size, downloading it only if unknown.
+
+        Blocking; call it from a worker thread and hand the image to the Tk thread.
+        """
+        digest = self.store.get(self.NAMESPACE, url)
+        if digest:
+            thumb_path = self._path(digest, size)
+            if os.path.exists(thumb_path):
+                os.utime(thumb_path)  # Keep recently shown posters out of eviction
+                with Image.open(thumb_path) as img:
+                    img.load()
+                    return img
+            if os.path.exists(self._path(digest)):
+                with open(self._path(digest), "rb") as f:
+                    return self._make_thumbnail(digest, f.read(), size)
+
+        data = HttpClient.default().get_bytes(url)
+        digest = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self._path(digest)):
+            self._write(self._path(digest), data)
+        self.store.set(self.NAMESPACE, url, digest, ttl=0)
+        img = self._make_thumbnail(digest, data, size)
+        self.evict()
+        return img
+
+    def _make_thumbnail(self, digest, data, size):
+        img = Image.open(BytesIO(data))
+        img.draft("RGB", size)  # Lets the JPEG decoder skip straight to a reduced scale
+        img = img.convert("RGB").resize(size)
+        buffer = BytesIO()
+        img.save(buffer, "JPEG", quality=90)
+        self._write(self._path(digest, size), buffer.getvalue())
+        return img
+
+    def evict(self, max_bytes=None):
+        """Delete the least recently used files until the directory fits in the size limit."""
+        max_bytes = Config.get_int('Poster Cache MB', 200) * 1024 * 1024 if max_bytes is None else max_bytes
+        if not max_bytes:
+            return
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
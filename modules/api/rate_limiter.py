@@ -0,0 +1,56 @@
+import time
+import threading
+
+class TokenBucket:
+    """Blocking token bucket: up to `calls` requests, refilled evenly over `per` seconds.
+
+    Shared by every thread that talks to one API, so concurrent lookups run
+    at the highest rate the API's plan allows instead of tripping its limit.
+    """
+    def __init__(self, calls, per):
+        self.capacity = max(1.0, float(calls))
+        self.fill_rate = self.capacity / max(0.001, float(per))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_setting(cls, value):
+        """Build a bucket from a "calls/seconds" setting such as "20/10"; None if unset or invalid."""
+        try:
+            calls, per = str(value).split("/", 1)
+            calls, per = float(calls), float(per)
+        except ValueError:
+            return None
+        return cls(calls, per) if calls > 0 and per > 0 else None
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self.paused_until - now
+                if wait <= 0:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+    def has_spare(self, reserve=0.5):
+        """True while more than `reserve` of the bucket is left, i.e. optional calls won't delay required ones."""
+        with self._lock:
+            if time.monotonic() < self.paused_until:
+                return False
+            tokens = min(self.capacity, self.tokens + (time.monotonic() - self.updated) * self.fill_rate)
+            return tokens > self.capacity * reserve
+
+    def pause(self, seconds):
+        """Hold every caller back for a while, e.g. after the server answered 429 with Retry-After."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 1)  # One call may go as soon as the pause ends
+            self.updated = self.paused_until
@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import Logger
+from modules.api.cache_store import CacheStore
+from modules.api.http_client import HttpClient
+
+class Revalidator:
+    """Stale-while-revalidate for one API's cached JSON responses.
+
+    lookup() answers from the cache. A stale entry is returned straight
+    away and refreshed in the background with a conditional GET carrying its
+    ETag/Last-Modified; a 304 just marks it fresh again, so a long-running
+    show's episode list is kept current without slowing down a lookup.
+    fetch() is the blocking path for keys that aren't cached at all.
+    """
+    WORKERS = 2
+    NO_STORE = object()     # parse() result for responses that mustn't be cached (e.g. a quota error)
+    _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="revalidate")
+    _pending = set()
+    _pending_lock = threading.Lock()
+
+    def __init__(self, cache, api):
+        self.cache = cache      # OMDBCache or TVMazeCache
+        self.api = api
+        self.http = HttpClient.default()
+        self.logger = Logger.get_logger(__name__)
+
+    def lookup(self, key, url, params=None, parse=None):
+        """Cached value for key (None for a known miss), or CacheStore.MISSING.
+
+        Stale values are returned as they are and refreshed in the
+        background; expired misses count as not cached.
+        """
+        entry = self.cache.entry(key)
+        if entry is None or (entry['stale'] and entry['value'] is None):
+            return CacheStore.MISSING
+        if entry['stale']:
+            self._schedule(key, url, params, parse, entry)
+        return entry['value']
+
+    def fetch(self, key, url, params=None, parse=None):
+        """GET url, cache parse(data) with its validators and return it; a None result is cached as a miss."""
+        data, etag, last_modified = self.http.get_json(url, params, api=self.api, with_validators=True)
+        value = parse(data) if parse else data
+        if value is self.NO_STORE:
+            return None
+        if value is None:
+            self.cache.set_negative(key)
+        else:
+            self.cache.set(key, value, etag, last_modified)
+        return value
+
+    def _schedule(self, key, url, params, parse, entry):
+        pending_key = (self.cache.NAMESPACE, key)
+        with self._pending_lock:
+            if pending_key in self._pending:
+                return
+            self._pending.add(pending_key)
+        self._executor.submit(self._refresh, pending_key, url, params, parse, entry)
+
+    def _refresh(self, pending_key, url, params, parse, entry):
+        key = pending_key[1]
+        try:
+            data, etag, last_modified = self.http.revalidate_json(url, params, entry['etag'],
+                                                                  entry['last_modified'], api=self.api)
+            value = None if data is None else (parse(data) if parse else data)
+            if value is None or value is self.NO_STORE:
+                # Not modified, or the API has nothing better now: keep the copy we have
+                self.cache.touch(key)
+                self.logger.debug(f"Revalidated {self.api} {key}: unchanged")
+            else:
+                self.cache.set(key, value, etag, last_modified)
+                self.logger.debug(f"Revalidated {self.api} {key}: refreshed")
+        except Exception as e:
+            # Keep serving the stale copy; the next lookup tries again
+            self.logger.warning(f"Could not revalidate {self.api} {key}: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending.discard(pending_key)
@@ -0,0 +1,128 @@
+import heapq
+import threading
+from collections import Counter
+
+from config import Config
+from utils import Logger
+from modules.api.cache_store import CacheStore
+from modules.api.local_index import LocalMetadataIndex
+
+class TitleMatcher:
+    """Trigram index over known titles for ranking mangled volume labels.
+
+    Known titles are the OMDB results already in the metadata cache plus
+    the most popular titles and the shows of the local metadata index. A
+    guess such as "THE OFFICE" or "MATRIX RELOADED" is scored against every
+    candidate sharing a trigram with it (Dice coefficient), in a few
+    milliseconds and without touching the network. Only the guess's rarest
+    trigrams nominate candidates; common ones (those of "the", "of", ...)
+    just add to the score of titles found that way.
+    """
+    INDEX_SIZE = 50000      # Most-voted local titles loaded into the index
+    NOMINATIONS = 1000      # Postings read to nominate candidates, rarest trigrams first
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        self.candidates = []    # (title, media_type, year, imdb_id, trigram count)
+        self._seen = set()
+        self._postings = {}     # trigram -> candidate indexes
+        self._common = {}       # trigram -> (posting count, set of its candidates) for common trigrams
+        self._built = False
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.logger = Logger.get_logger(__name__)
+
+    @classmethod
+    def default(cls):
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def trigrams(text):
+        norm = f"  {LocalMetadataIndex.normalize(text)} "
+        return {norm[i:i + 3] for i in range(len(norm) - 2)}
+
+    @staticmethod
+    def threshold():
+        """Minimum confidence (0-1) for a match to be used without asking the user."""
+        return Config.get_int('Title Match Confidence', 70) / 100
+
+    def add(self, title, media_type=None, year=None, imdb_id=None):
+        key = LocalMetadataIndex.normalize(title)
+        if not key:
+            return
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen.add(key)
+            grams = self.trigrams(title)
+            idx = len(self.candidates)
+            self.candidates.append((title, media_type, year, imdb_id, len(grams)))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(idx)
+
+    def build(self):
+        """Load the known titles; runs once, on first use, and other callers wait for it to finish."""
+        if self._built:
+            return
+        with self._build_lock:
+            if self._built:
+                return
+            for info in CacheStore.default().values("omdb", "query:"):
+                if info and info.get("Title"):
+                    self.add(info["Title"], info.get("Type"), info.get("Year"), info.get("IMDB"))
+            index = LocalMetadataIndex.default()
+            for title, media_type, year, imdb_id in index.popular_titles(self.INDEX_SIZE):
+                self.add(title, media_type, year, imdb_id)
+            for name, premiered in index.show_names():
+                self.add(name, "series", (premiered or "")[:4])
+            self._built = True
+        self.logger.debug(f"Title matcher indexed {len(self.candidates)} titles")
+
+    def _members(self, gram, posting):
+        """Set of a common trigram's candidates, rebuilt only when titles have been added to it."""
+        cached = self._common.get(gram)
+        if cached is None or cached[0] != len(posting):
+            cached = self._common[gram] = (len(posting), set(posting))
+        return cached[1]
+
+    def rank(self, text, limit=5):
+        """Best candidates for text as [(confidence, title, media_type, year, imdb_id)], best first."""
+        self.build()
+        grams = self.trigrams(text)
+        if not grams:
+            return []
+        shared = Counter()
+        with self._lock:
+            postings = sorted(((gram, self._postings[gram]) for gram in grams if gram in self._postings),
+                              key=lambda item: len(item[1]))
+            if not postings:
+                return []
+            nominating, read = 1, len(postings[0][1])   # The rarest trigram always nominates
+            while nominating < len(postings) and read + len(postings[nominating][1]) <= self.NOMINATIONS:
+                read += len(postings[nominating][1])
+                nominating += 1
+            for gram, posting in postings[:nominating]:
+                shared.update(posting)
+            # The other trigrams only count towards candidates already found, walking whichever side is shorter
+            for gram, posting in postings[nominating:]:
+                if len(posting) <= len(shared):
+                    for idx in posting:
+                        if idx in shared:
+                            shared[idx] += 1
+                else:
+                    members = self._members(gram, posting)
+                    for idx in shared:
+                        if idx in members:
+                            shared[idx] += 1
+            ranked = heapq.nlargest(limit, ((2 * count / (len(grams) + self.candidates[idx][4]), idx)
+                                            for idx, count in shared.items()))
+            return [(round(score, 3),) + self.candidates[idx][:4] for score, idx in ranked]
+
+    def best_match(self, text):
+        """(title, confidence) of the best candidate, or (None, 0.0) if nothing is known."""
+        ranked = self.rank(text, limit=1)
+        return (ranked[0][1], ranked[0][0]) if ranked else (None, 0.0)
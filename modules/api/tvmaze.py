@@ -1,79 +1,94 @@
 import requests
 from tkinter import messagebox
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
 
 from utils import Logger
 from modules.api.tvmaze_cache import TVMazeCache
+from modules.api.cache_store import CacheStore
+from modules.api.local_index import LocalMetadataIndex
+from modules.api.http_client import HttpClient
+from modules.api.revalidator import Revalidator
 
 class TVMazeAPI:
     BASE_URL = "https://api.tvmaze.com"
 
     def __init__(self):
-        self.session = requests.Session()
-        retries = Retry(total=5, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        self.http = HttpClient.default()  # Shared, so creating a TVMazeAPI per click is cheap
         self.tvmaze_cache = TVMazeCache()
+        self.revalidator = Revalidator(self.tvmaze_cache, "tvmaze")
         self.logger = Logger.get_logger(__name__)
 
-    def search_show(self, query):
+    def search_show(self, query, show_errors=True):
         cache_key = f"search:{query}"
-        cached = self.tvmaze_cache.get(cache_key)
-        if cached:
+        url = f"{self.BASE_URL}/search/shows"
+        params = {"q": query}
+        cached = self.revalidator.lookup(cache_key, url, params, self._parse_search)
+        if cached is not CacheStore.MISSING:
             self.logger.debug(f"TVMaze search cache hit for {query}")
-            return cached
+            return cached or []
+        local = LocalMetadataIndex.default().search_shows(query)
+        if local:
+            return local
         
-        url = f"{self.BASE_URL}/search/shows?q={query}"
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            result = response.json()
-            self.tvmaze_cache.set(cache_key, result)
-            return result
+            return self.revalidator.fetch(cache_key, url, params, self._parse_search) or []
         except requests.RequestException as e:
             self.logger.error(f"TVMaze search failed: {e}")
-            messagebox.showerror("Error", f"TVMaze search failed:\n{e}")
+            if show_errors:
+                messagebox.showerror("Error", f"TVMaze search failed:\n{e}")
             return []
 
-    def get_show_details(self, show_id):
+    @staticmethod
+    def _parse_search(result):
+        return result or None  # No results are cached as a miss
+
+    def get_show_details(self, show_id, show_errors=True):
         cache_key = f"show:{show_id}"
-        cached = self.tvmaze_cache.get(cache_key)
-        if cached:
+        url = f"{self.BASE_URL}/shows/{show_id}"
+        cached = self.revalidator.lookup(cache_key, url)
+        if cached is not CacheStore.MISSING:
             self.logger.debug(f"TVMaze show cache hit for {show_id}")
             return cached
         
-        url = f"{self.BASE_URL}/shows/{show_id}"
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            result = response.json()
-            self.tvmaze_cache.set(cache_key, result)
-            return result
+            return self.revalidator.fetch(cache_key, url)
         except requests.RequestException as e:
             self.logger.error(f"TVMaze show details fetch failed: {e}")
-            messagebox.showerror("Error", f"TVMaze show detailes fetch failed:\n{e}")
+            if show_errors:
+                messagebox.showerror("Error", f"TVMaze show detailes fetch failed:\n{e}")
             return None
         
+    def get_show_index(self, show_id):
+        """Seasons and episodes (grouped by season) of a show, fetched in a single embedded request."""
+        cache_key = f"show-index:{show_id}"
+        url = f"{self.BASE_URL}/shows/{show_id}"
+        params = {"embed[]": ["episodes", "seasons"]}
+        # A stale index (e.g. of a show that is still airing) is served while it's revalidated
+        cached = self.revalidator.lookup(cache_key, url, params, self._parse_show_index)
+        if cached is not CacheStore.MISSING:
+            self.logger.debug(f"TVMaze show index cache hit for {show_id}")
+            return cached
+        local = LocalMetadataIndex.default().show_index(show_id)
+        if local:
+            return local
+
+        return self.revalidator.fetch(cache_key, url, params, self._parse_show_index)
+
+    @staticmethod
+    def _parse_show_index(show):
+        embedded = show.get('_embedded', {})
+        episodes = {}
+        for ep in embedded.get('episodes', []):
+            ep['runtime_seconds'] = (ep.get('runtime') or 42) * 60  # Default to 42 minutes if runtime is not available
+            episodes.setdefault(str(ep['season']), []).append(ep)
+        return {'seasons': embedded.get('seasons', []), 'episodes': episodes}
+
     def get_seasons(self, show_id):
-        url = f"https://api.tvmaze.com/shows/{show_id}/seasons"
-        response = requests.get(url)
-        if response.status_code == 200:
-           return response.json()
-        return []
+        try:
+            return self.get_show_index(show_id)['seasons']
+        except requests.RequestException as e:
+            self.logger.error(f"TVMaze seasons fetch failed: {e}")
+            return []
 
     def get_episodes(self, show_id, season=None):
-        cache_key = f"episodes:{show_id}:{season}"
-        cached = self.tvmaze_cache.get(cache_key)
-        if cached:
-            self.logger.debug(f"TVMaze episodes cache hit for {show_id}:{season}")
-            return cached
-        
-        url = f"{self.BASE_URL}/shows/{show_id}/episodes"
-        response = self.session.get(url)
-        response.raise_for_status()
-        all_episodes = response.json()
-        filtered = [ep for ep in all_episodes if ep['season'] == season]
-        for ep in filtered:
-            ep['runtime_seconds'] = (ep.get('runtime') or 42) * 60  # Default to 42 minutes if runtime is not available
-        self.tvmaze_cache.set(cache_key, filtered)
-        return filtered
+        """Episodes of one season, sliced from the cached show index."""
+        return self.get_show_index(show_id)['episodes'].get(str(season), [])
@@ -1,19 +1,22 @@
 import subprocess
 import re
-from tkinter import ttk
 
 from config import Config
+from utils import ProcessUtils
+from modules.jobs.supervisor import JobSupervisor, JobCancelled
+from modules.jobs.watchdog import ProcessWatchdog
 
 class HandBrakeHandler:
-    def __init__(self, input_file=None, output_dir=None):
+    def __init__(self, input_file=None, output_dir=None, threads=None):
         self.output_dir = output_dir or Config.get('Encode Directory')
         self.handbrake_executable = Config.get('HandBrake Path')
         self.preset_file = Config.get('HB Presets File')
         self.preset = Config.get('HandBrake Presets')
         self.input_file = input_file
+        self.threads = threads if threads is not None else Config.get_int('HandBrake Threads')
     
-    def transcode(self, output_path, progress_widget=None):
-        """Transcode a single file using HandBrakeCLI"""
+    def transcode(self, output_path, progress_widget=None, job_id=None):
+        """Transcode a single file using HandBrakeCLI; progress_widget is the row's RowProgress."""
         cmd = [
             self.handbrake_executable,
             "--preset-import-file", self.preset_file,  # Import presets from the JSON file
@@ -21,15 +24,31 @@ class HandBrakeHandler:
             "-i", self.input_file,
             "-o", output_path
         ]
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-        for line in iter(process.stdout.readline, ""):
-            match = re.search(r"(\d{1,3}\.\d{1,2}\s?%)", line)
-            if match and progress_widget:
-                percent = float(match.group(1).strip().replace('%', ''))
-                progress_widget["value"] = percent
-                progress_widget.configure(style="transcode.Horizontal.TProgressbar")
-                style = ttk.Style()
-                style.configure("transcode.Horizontal.TProgressbar", text=f"{percent}%", anchor='center')
-                progress_widget.update_idletasks()
-        process.stdout.close()
-        process.wait()
+        if self.threads:
+            cmd += ["--encopts", f"threads={self.threads}"]  # Cap encoder threads so several encodes can share the CPU
+        cmd = ProcessUtils.command(cmd)
+        supervisor = JobSupervisor.default()
+        if job_id:
+            process = supervisor.popen(job_id, cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        else:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        state = {'updates': 0}
+
+        def read_output(stdout):
+            for line in iter(stdout.readline, ""):
+                match = re.search(r"(\d{1,3}\.\d{1,2}\s?%)", line)
+                if match:
+                    state['updates'] += 1
+                if match and progress_widget:
+                    percent = float(match.group(1).strip().replace('%', ''))
+                    progress_widget.set(percent)  # Coalesced and applied on the Tk thread at the UI frame rate
+
+        try:
+            ProcessWatchdog(process, job_id, kind="transcode").run(read_output, lambda: state['updates'])
+            process.stdout.close()  # Left to the reader after a stall; closing would block on its pending read
+        finally:
+            process.wait()
+        if job_id and supervisor.is_cancelled(job_id):
+            raise JobCancelled(job_id)
+        if process.returncode != 0:
+            raise RuntimeError(f"HandBrakeCLI exited with code {process.returncode}")
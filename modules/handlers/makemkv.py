@@ -1,20 +1,36 @@
 import os, re
+import shutil
+import tempfile
 import subprocess
 import threading
-from tkinter import ttk, messagebox
-from collections import defaultdict
+from concurrent import futures
+from tkinter import messagebox
 
 from config import Config
-from utils import Logger
+from utils import Logger, ProcessUtils
 from views.dialogs.progress import ProgressDialog
+from modules.handlers.robot_parser import RobotOutputParser
+from modules.handlers.scan_cache import ScanCache
+from modules.jobs.supervisor import JobSupervisor, JobCancelled
+from modules.jobs.watchdog import ProcessWatchdog, StallError, run_with_retries
+from modules.jobs.progress_bus import ProgressBus
 from data.ripdatabase import RippingDatabase
 
 class MakeMKVHandler:
-    def __init__(self, disc_idx=0, iso_path=None, progress_callback=None):
+    DRIVE_INSERTED = 2  # DRV state reported by makemkvcon for a drive with a disc in it
+    _claimed_outputs = set()    # Final paths handed out this session, across every drive
+    _claim_lock = threading.Lock()
+
+    def __init__(self, disc_idx=0, iso_path=None, progress_callback=None, volume_label=None, device=None):
         self.disc_idx = disc_idx
         self.iso_path = iso_path
+        self.volume_label = volume_label
+        self.device = device
         self.progress_callback = progress_callback
-        self._scan_dict = defaultdict(dict)
+        self.revalidated_callback = None  # Called with fresh results when a background re-scan disagrees with the cache
+        self.revalidate_thread = None
+        self.from_cache = False
+        self._scan_dict = {}
         self.current_prgt = ""
         self.current_prgc = ""
         self.scan_results = []
@@ -22,71 +38,112 @@ class MakeMKVHandler:
         if not os.path.exists(self.makemkv_path):
             raise FileNotFoundError(f"MakeMKV executable not found at {self.makemkv_path}")
         self._active_proc = None  # Store the current rip process
+        self._active_job = None
+        self.supervisor = JobSupervisor.default()
         self.logger = Logger.get_logger(__name__)
     
     def _emit_progress(self, title, message, percent=None):
         if self.progress_callback:
             self.progress_callback(title, message, percent)
     
-    def _parse_output(self, line):
-        if match := re.match(r'^PRGT:\d+,\d+,"(.+)"', line):
-            self.current_prgt = match.group(1)
-            self._emit_progress(self.current_prgt, self.current_prgc or "")
-        elif match := re.match(r'^PRGC:\d+,\d+,"(.+)"', line):
-            self.current_prgc = match.group(1)
-            self._emit_progress(self.current_prgt or "", self.current_prgc)
-        elif match := re.match(r'^PRGV:(\d+),(\d+),(\d+)', line):
-            completed, _, total = map(int, match.groups())
-            percent = int((completed / total) * 100) if total > 0 else 0
-            self._emit_progress(self.current_prgt or "", self.current_prgc or "", percent)
-        elif match := re.match(r'^MSG:\d+,.+,"(.+)"', line):
-            self._emit_progress(self.current_prgt or "", match.group(1))
-        elif match := re.match(r'TINFO:(\d+),(\d+),\d+,"(.*)"', line):
-            title_idx = int(match.group(1))
-            field_id = int(match.group(2))
-            value = match.group(3).strip()
-
-            self._scan_dict[title_idx][field_id] = value
-
-            # Only process when both duration (field 9) and name (field 27) are available
-            fields = self._scan_dict[title_idx]
-            if 9 in fields and 27 in fields and not any(r['index'] == title_idx for r in self.scan_results):
-                # Duration format: HH:MM:SS or number of seconds
-                duration_raw = fields[9]
-                total_seconds = None
-                if match := re.match(r'(\d+):(\d+):(\d+)', duration_raw):
-                    h, m, s = map(int, match.groups())
-                    total_seconds = h * 3600 + m * 60 + s
-                elif duration_raw.isdigit():
-                    total_seconds = int(duration_raw)
-
-                self.scan_results.append({
-                    'index': title_idx,
-                    'duration': total_seconds,
-                    'name': fields[27] or f"Title_{title_idx}"
-                })
-    
-    def _run_command(self, args):
+    def _new_parser(self, progress_callback=None):
+        parser = RobotOutputParser(progress_callback=progress_callback)
+        # Scan results are filled in as the parser sees them
+        self.scan_results = parser.scan_results
+        self._scan_dict = parser.titles
+        return parser
+
+    def _popen(self, args, job_id=None):
+        """Start makemkvcon with a binary, block-buffered stdout for the robot parser."""
+        kwargs = dict(stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=RobotOutputParser.READ_BUFFER_SIZE)
+        args = ProcessUtils.command(args)
+        if job_id:
+            # Launched through the supervisor so the job can be cancelled from the UI
+            self._active_proc = self.supervisor.popen(job_id, args, **kwargs)
+        else:
+            self._active_proc = subprocess.Popen(args, **kwargs)
+        self._active_job = job_id
+        return self._active_proc
+
+    def _run_command(self, args, fingerprint=None):
         self.logger.info("Scanning Disc/ISO...")
-        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
-        for line in iter(process.stdout.readline, ""):
-            self._parse_output(line.strip())                
+        parser = self._new_parser(self._emit_progress)
+        process = self._popen(args)
+        parser.parse_stream(process.stdout)
         process.stdout.close()
         process.wait()
+        self.current_prgt = parser.current_prgt
+        self.current_prgc = parser.current_prgc
+        if fingerprint and process.returncode == 0 and parser.scan_results:
+            ScanCache().set(fingerprint, parser.scan_results, parser.titles)
+
+    def _revalidate(self, args, fingerprint, cached):
+        """Re-scan in the background after serving a cache hit and refresh the cache if the disc changed."""
+        parser = RobotOutputParser()
+        process = self._popen(args)
+        parser.parse_stream(process.stdout)
+        process.stdout.close()
+        process.wait()
+        if process.returncode != 0 or not parser.scan_results:
+            return
+        ScanCache().set(fingerprint, parser.scan_results, parser.titles)
+        if parser.scan_results != cached['scan_results']:
+            self.logger.info("Re-scan differs from the cached scan; refreshing titles")
+            if self.revalidated_callback:
+                self.revalidated_callback(parser.scan_results)
+
+    def fingerprint(self):
+        """Cheap identity of the ISO or disc used as the scan cache key (None if it can't be determined)."""
+        try:
+            if self.iso_path:
+                return ScanCache.fingerprint_iso(self.iso_path)
+            if self.volume_label:
+                return ScanCache.fingerprint_disc(self.volume_label, self.device)
+        except OSError as e:
+            self.logger.warning(f"Could not fingerprint disc: {e}")
+        return None
     
-    def scan(self):
-        """Scan the disc or ISO for titles."""
+    def list_drives(self):
+        """Enumerate optical drives; disc:9999 makes makemkvcon list drives without opening one."""
+        parser = RobotOutputParser()
+        process = self._popen([self.makemkv_path, '-r', '--cache=1', 'info', 'disc:9999'])
+        parser.parse_stream(process.stdout)
+        process.stdout.close()
+        process.wait()
+        return [d for d in parser.drives if d['drive_name']]
+
+    def scan(self, use_cache=None, revalidate=None):
+        """Scan the disc or ISO for titles, answering from the scan cache when the disc is known."""
+        use_cache = Config.get('Scan Cache') if use_cache is None else use_cache
+        revalidate = Config.get('Revalidate Cached Scans') if revalidate is None else revalidate
         # Determine if Disc or ISO
         if self.iso_path:
             cmd = [self.makemkv_path, '-r', '--progress=-same', '--minlength=120', 'info', f"iso:{self.iso_path}"]
         else:
             cmd = [self.makemkv_path, '-r', '--progress=-same', '--minlength=120', 'info', f"disc:{self.disc_idx}"]
 
-        thread = threading.Thread(target=self._run_command, args=(cmd,))
+        fingerprint = self.fingerprint() if use_cache else None
+        if not self.iso_path and ScanCache.mounted_size(self.device) is None:
+            # Only the volume label identifies the disc, and generic labels are shared by many discs:
+            # check the cached titles against a real scan of the title layout
+            revalidate = True
+        cached = ScanCache().get(fingerprint)
+        if cached:
+            self.logger.info(f"Scan cache hit for {fingerprint}")
+            self.scan_results = cached['scan_results']
+            self.from_cache = True
+            if revalidate:
+                self.revalidate_thread = threading.Thread(target=self._revalidate, args=(cmd, fingerprint, cached), daemon=True)
+                self.revalidate_thread.start()
+            thread = threading.Thread(target=self._emit_progress, args=("", "Loaded titles from scan cache", 100))
+            thread.start()
+            return thread
+
+        thread = threading.Thread(target=self._run_command, args=(cmd, fingerprint))
         thread.start()
         return thread
     
-    def rip(self, title_index, output_path, iso_path=None, progress_widget=None, status_callback=None):
+    def rip(self, title_index, output_path, iso_path=None, progress_widget=None, status_callback=None, job_id=None):
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
         if iso_path:
@@ -95,89 +152,173 @@ class MakeMKVHandler:
             cmd = [self.makemkv_path, '-r', '--progress=-same', 'mkv', f"disc:{self.disc_idx}", str(title_index), output_path]
 
         self.logger.info(f"Ripping title {title_index}...")
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
-        for line in iter(process.stdout.readline, ""):
-            line = line.strip()
-            if match := re.match(r'^PRGC:\d+,\d+,"(.+)"', line):
-                self.current_prgc = match.group(1)
+        def on_progress(title, message, percent):
+            if percent is not None:
+                if progress_widget:
+                    progress_widget.set(percent)  # Coalesced and applied on the Tk thread at the UI frame rate
+            elif parser.current_prgc != self.current_prgc:
+                self.current_prgc = parser.current_prgc
                 if status_callback:
                     status_callback(self.current_prgc)
-            elif match := re.match(r'^PRGV:(\d+),(\d+),(\d+)', line):
-                completed, _, total = map(int, match.groups())
-                percent = int((completed / total) * 100) if total > 0 else 0
-                if progress_widget:
-                    progress_widget["value"] = percent
-                    progress_widget.configure(style="text.Horizontal.TProgressbar")
-                    style = ttk.Style()
-                    style.configure("text.Horizontal.TProgressbar", text=f"{percent}%", anchor='center')
-                    progress_widget.update_idletasks()
-        process.stdout.close()
-        process.wait()
+
+        parser = RobotOutputParser(progress_callback=on_progress)
+        process = self._popen(cmd, job_id)
+        try:
+            ProcessWatchdog(process, job_id, kind="rip").run(parser.parse_stream, lambda: parser.progress_lines)
+            process.stdout.close()  # Left to the reader after a stall; closing would block on its pending read
+        finally:
+            process.wait()
+        if job_id and self.supervisor.is_cancelled(job_id):
+            raise JobCancelled(job_id)
     
+    @classmethod
+    def claim_output(cls, output_dir, name):
+        """A file name under output_dir that no other rip (on any drive) or existing file uses: name, name (2), ..."""
+        with cls._claim_lock:
+            candidate, n = name, 1
+            while (os.path.join(output_dir, f"{candidate}.mkv") in cls._claimed_outputs
+                   or os.path.exists(os.path.join(output_dir, f"{candidate}.mkv"))):
+                n += 1
+                candidate = f"{name} ({n})"
+            cls._claimed_outputs.add(os.path.join(output_dir, f"{candidate}.mkv"))
+            return candidate
+
     def rip_selected(self, titles, output_dir, rip_table, iso_path=None, status_callback=None):
         """Rip selected titles using in-row progress bars."""
         if not titles:
             self.logger.info(f"No Titles: No titles found to rip.")
             return
         os.makedirs(output_dir, exist_ok=True)
+        # Register every title up front so Stop Rip also cancels the ones still queued
+        for title in titles:
+            title['rip_job'] = rip_table.job_id('rip', title['row_index'])
+            title['transcode_job'] = rip_table.job_id('transcode', title['row_index'])
+            self.supervisor.register(title['rip_job'])
+            self.supervisor.register(title['transcode_job'])
 
         def run_rips():
-            for i, title in enumerate(titles):
-                title_index = title['index']
-                tmp_name = title['title_name'] or f"Title_{title_index}"
-                tmp_name = "".join(c for c in tmp_name if c.isalnum() or c in (' ', '-', '_','(',')')).rstrip()
-                tmp_name = tmp_name.replace(":", "_")
-                title_name = tmp_name
-                title['final_name'] = title_name
-                pattern = re.compile(rf".*_t0*{title_index}\.mkv", re.IGNORECASE)
-                old_path = None
-
-                progress_widget = rip_table.start_rip_progress(title['row_index'])
-                try:
-                    self.rip(title_index, output_dir, iso_path, progress_widget, status_callback=status_callback)
-                    for f in os.listdir(output_dir):
-                        if pattern.match(f):
-                            old_path = os.path.join(output_dir, f)
-                            break
-                    new_path = os.path.join(output_dir, f"{title_name}.mkv")
-                    os.rename(old_path, new_path)
-                    progress_widget["value"] = 100  # Complete
+            # Each title is handed to the shared transcode stage as soon as it is ripped,
+            # so HandBrake works on title N while MakeMKV reads title N+1
+            transcode_stage = getattr(rip_table.master, "transcode_stage", None)
+            pending = []
+            disc_id = None
+            # Rip into a private staging directory so concurrent drives never pick up each other's files
+            staging_dir = tempfile.mkdtemp(prefix=".rip-", dir=output_dir)
 
+            try:
+                for i, title in enumerate(titles):
+                    title_index = title['index']
+                    tmp_name = title['title_name'] or f"Title_{title_index}"
+                    tmp_name = "".join(c for c in tmp_name if c.isalnum() or c in (' ', '-', '_','(',')')).rstrip()
+                    tmp_name = tmp_name.replace(":", "_")
+                    title_name = tmp_name
+                    title['final_name'] = title_name
+                    title['rip_table'] = rip_table
+                    pattern = re.compile(rf".*_t0*{title_index}\.mkv", re.IGNORECASE)
+                    old_path = None
+
+                    def remove_partials():
+                        for f in os.listdir(staging_dir):
+                            if pattern.match(f):
+                                os.remove(os.path.join(staging_dir, f))
+
+                    def on_retry(error, attempt):
+                        self.logger.warning(f"Title {title_index} {error.reason}; retrying (attempt {attempt + 1})")
+                        remove_partials()
+                        if status_callback:
+                            status_callback(f"Title {title_index} stalled, retrying...")
+
+                    if self.supervisor.is_cancelled(title['rip_job']):
+                        self.supervisor.finish(title['rip_job'])
+                        self.supervisor.finish(title['transcode_job'])
+                        rip_table.show_cancelled(title['row_index'], 'rip')
+                        rip_table.show_cancelled(title['row_index'], 'transcode')
+                        continue
+
+                    progress_widget = rip_table.start_rip_progress(title['row_index'])
+                    submitted = False
                     try:
-                        db = RippingDatabase()
-                        disc_id = db.add_disc(
-                            title=rip_table.master.current_title or "Unknown",
-                            media_type=rip_table.master.media_type or "unknown",
-                            year=rip_table.master.title_year or "",
-                            volume_label="Unknown",  # Optional: replace if you detect volume label
-                            metadata=""
-                        )
-                        db.add_rip(
-                            disc_id=disc_id,
-                            title_index=title_index,
-                            title_name=title_name,
-                            duration=title['duration'],
-                            output_path=new_path
-                        )
-                    except Exception as db_err:
-                        self.logger.warning(f"Failed to log rip to database: {db_err}")
-                except Exception as e:
-                    self.logger.error(f"Failed to rip title {title_index}: {e}")
-                    messagebox.showerror("Error", f"Failed to rip title {title_index}:\n{e}")
-                    progress_widget.config(style="red.Horizontal.TProgressbar")
+                        run_with_retries(lambda: self.rip(title_index, staging_dir, iso_path, progress_widget,
+                                                          status_callback=status_callback, job_id=title['rip_job']),
+                                         on_retry=on_retry)
+                        for f in os.listdir(staging_dir):
+                            if pattern.match(f):
+                                old_path = os.path.join(staging_dir, f)
+                                break
+                        if old_path is None:
+                            raise FileNotFoundError(f"MakeMKV finished but no MKV for title {title_index} was found")
+                        # Same-named titles (e.g. Title_1 on two drives) must not overwrite each other
+                        title_name = title['final_name'] = self.claim_output(output_dir, title_name)
+                        new_path = os.path.join(output_dir, f"{title_name}.mkv")
+                        os.replace(old_path, new_path)
+                        progress_widget.set(100)
+
+                        try:
+                            db = RippingDatabase.default()
+                            if disc_id is None:
+                                # One row per physical disc; re-rips of a known disc attach to its existing row
+                                disc_id = db.add_disc(
+                                    title=rip_table.master.current_title or "Unknown",
+                                    media_type=rip_table.master.media_type or "unknown",
+                                    year=rip_table.master.title_year or "",
+                                    volume_label=getattr(rip_table.master, "disc_label", None) or "Unknown",
+                                    metadata="",
+                                    disc_key=getattr(rip_table.master, "layout_key", None)
+                                )
+                            db.add_rip(
+                                disc_id=disc_id,
+                                title_index=title_index,
+                                title_name=title_name,
+                                duration=title['duration'],
+                                output_path=new_path
+                            )
+                        except Exception as db_err:
+                            self.logger.warning(f"Failed to log rip to database: {db_err}")
+                        if transcode_stage:
+                            pending.append(transcode_stage.submit(title))
+                            submitted = True
+                    except JobCancelled:
+                        self.logger.info(f"Rip of title {title_index} cancelled")
+                        # Drop the partial MKV; the next title can use the drive straight away
+                        remove_partials()
+                        rip_table.show_cancelled(title['row_index'], 'rip')
+                        rip_table.show_cancelled(title['row_index'], 'transcode')
+                    except StallError as e:
+                        # Mark the title failed and move on to the next one
+                        self.logger.error(f"Failed to rip title {title_index}: {e}")
+                        remove_partials()
+                        progress_widget.fail()
+                        if ProcessWatchdog.notify():
+                            ProgressBus.default().post(lambda e=e, i=title_index: messagebox.showerror(
+                                "Error", f"Failed to rip title {i}:\n{e}"))
+                    except Exception as e:
+                        self.logger.error(f"Failed to rip title {title_index}: {e}")
+                        progress_widget.fail()
+                        ProgressBus.default().post(lambda e=e, i=title_index: messagebox.showerror(
+                            "Error", f"Failed to rip title {i}:\n{e}"))
+                    finally:
+                        self.supervisor.finish(title['rip_job'])
+                        if not submitted:
+                            # The transcode worker finishes a submitted job; nobody else would finish this one
+                            self.supervisor.finish(title['transcode_job'])
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
             if status_callback:
-                status_callback("All rips completed. Starting transcoding...")
-                self.logger.info("All rips completed. Starting transcoding...")
+                status_callback("All rips completed. Waiting for transcoding to finish...")
+                self.logger.info("All rips completed. Waiting for transcoding to finish...")
 
-            if hasattr(rip_table.master, "on_transcode"):
-                rip_table.master.on_transcode(titles)
+            if transcode_stage:
+                futures.wait(pending)
+                rip_table.master.on_transcode_complete()
                 
             if status_callback:
                 status_callback("All transcoding completed.")
-                messagebox.showinfo("Info", "All transcoding completed.")
+                ProgressBus.default().post(lambda: messagebox.showinfo("Info", "All transcoding completed."))
                 self.logger.info("All transcoding completed.")
 
-        threading.Thread(target=run_rips, daemon=True).start()
+        thread = threading.Thread(target=run_rips, daemon=True)
+        thread.start()
+        return thread
 
     def rip_all(self, titles, output, parent_win=None):
         """Rip all titles from the disc or ISO."""
@@ -203,7 +344,10 @@ class MakeMKVHandler:
             progress.close()
     
     def cancel(self):
-        if self._active_proc and self._active_proc.poll() is None:
+        """Cancel whatever this handler is currently running."""
+        if self._active_job:
+            self.supervisor.cancel(self._active_job)
+        elif self._active_proc and self._active_proc.poll() is None:
             self.logger.info("Cancelling active MakeMKV process...")
             self._active_proc.terminate()  # Sends SIGTERM on Unix, or terminates on Windows
             try:
@@ -0,0 +1,147 @@
+class RobotOutputParser:
+    """Streaming parser for makemkvcon robot mode (-r) output.
+
+    Lines are dispatched on their prefix (TINFO, PRGV, ...) through a lookup
+    table, so every line costs one partition and one dict lookup. Lines we
+    have no handler for (SINFO, CINFO, TCOUT, ...) are skipped without being
+    decoded.
+    """
+    READ_BUFFER_SIZE = 1 << 16
+
+    def __init__(self, progress_callback=None):
+        self.progress_callback = progress_callback
+        self.titles = {}          # title index -> {attribute id: value}
+        self.scan_results = []
+        self._results_by_index = {}
+        self.drives = []
+        self.current_prgt = ""
+        self.current_prgc = ""
+        self.percent = None
+        self.progress_lines = 0   # Every PRGV seen; lets a watchdog tell a slow rip from a stalled one
+        self._handlers = {
+            b"TINFO": self._on_tinfo,
+            b"PRGV": self._on_prgv,
+            b"PRGC": self._on_prgc,
+            b"PRGT": self._on_prgt,
+            b"MSG": self._on_msg,
+            b"DRV": self._on_drv,
+        }
+
+    def feed(self, line):
+        """Parse a single line of robot output (bytes or str)."""
+        if isinstance(line, str):
+            line = line.encode("utf-8")
+        prefix, sep, rest = line.partition(b":")
+        if not sep:
+            return
+        handler = self._handlers.get(prefix)
+        if handler:
+            handler(rest.rstrip(b"\r\n"))
+
+    def parse_stream(self, stream):
+        """Consume a binary stream (e.g. a child's stdout) until EOF."""
+        handlers = self._handlers
+        for line in stream:
+            prefix, sep, rest = line.partition(b":")
+            if not sep:
+                continue
+            handler = handlers.get(prefix)
+            if handler:
+                handler(rest.rstrip(b"\r\n"))
+
+    def parse_file(self, path):
+        with open(path, "rb", buffering=self.READ_BUFFER_SIZE) as f:
+            self.parse_stream(f)
+
+    def _emit_progress(self, title, message, percent=None):
+        if self.progress_callback:
+            self.progress_callback(title, message, percent)
+
+    @staticmethod
+    def _unquote(value):
+        """Return the first quoted string of a robot field list, decoded."""
+        if value.startswith(b'"'):
+            end = value.find(b'","', 1)
+            value = value[1:end] if end != -1 else value[1:].rstrip(b'"')
+        return value.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def parse_duration(duration_raw):
+        """Duration format: HH:MM:SS or number of seconds."""
+        parts = duration_raw.split(":")
+        if len(parts) == 3 and all(p.isdigit() for p in parts):
+            h, m, s = map(int, parts)
+            return h * 3600 + m * 60 + s
+        if duration_raw.isdigit():
+            return int(duration_raw)
+        return None
+
+    # TINFO:title,attribute,code,"value"
+    def _on_tinfo(self, rest):
+        fields = rest.split(b",", 3)
+        if len(fields) < 4:
+            return
+        title_idx = int(fields[0])
+        attributes = self.titles.get(title_idx)
+        if attributes is None:
+            attributes = self.titles[title_idx] = {}
+        attributes[int(fields[1])] = self._unquote(fields[3]).strip()
+
+        # Only publish a title once both duration (9) and name (27) are known
+        if title_idx not in self._results_by_index and 9 in attributes and 27 in attributes:
+            result = {
+                'index': title_idx,
+                'duration': self.parse_duration(attributes[9]),
+                'name': attributes[27] or f"Title_{title_idx}",
+                'size': int(attributes[11]) if attributes.get(11, "").isdigit() else None  # Bytes
+            }
+            self._results_by_index[title_idx] = result
+            self.scan_results.append(result)
+
+    # PRGV:current,total,max
+    def _on_prgv(self, rest):
+        fields = rest.split(b",")
+        if len(fields) < 3:
+            return
+        self.progress_lines += 1
+        completed, total = int(fields[0]), int(fields[2])
+        percent = int((completed / total) * 100) if total > 0 else 0
+        if percent != self.percent:
+            self.percent = percent
+            self._emit_progress(self.current_prgt, self.current_prgc, percent)
+
+    # PRGC:code,id,"name"
+    def _on_prgc(self, rest):
+        self.current_prgc = self._unquote(rest.split(b",", 2)[-1])
+        self.percent = None
+        self._emit_progress(self.current_prgt, self.current_prgc)
+
+    # PRGT:code,id,"name"
+    def _on_prgt(self, rest):
+        self.current_prgt = self._unquote(rest.split(b",", 2)[-1])
+        self._emit_progress(self.current_prgt, self.current_prgc)
+
+    # MSG:code,flags,count,"message","format",params...
+    def _on_msg(self, rest):
+        fields = rest.split(b",", 3)
+        if len(fields) == 4:
+            self._emit_progress(self.current_prgt, self._unquote(fields[3]))
+
+    # DRV:index,visible,enabled,flags,"drive name","disc name","device"
+    def _on_drv(self, rest):
+        fields = rest.split(b",", 4)
+        if len(fields) < 5:
+            return
+        quoted = fields[4]
+        if quoted.startswith(b'"') and quoted.endswith(b'"'):
+            quoted = quoted[1:-1]
+        names = [v.decode("utf-8", errors="replace") for v in quoted.split(b'","')]
+        names += [""] * (3 - len(names))
+        self.drives.append({
+            'index': int(fields[0]),
+            'visible': int(fields[1]),
+            'enabled': int(fields[2]),
+            'drive_name': names[0],
+            'disc_name': names[1],
+            'device': names[2],
+        })
@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+from config import Config
+
+class ScanCache:
+    """Persistent `makemkvcon info` results keyed by a cheap disc fingerprint.
+
+    Each fingerprint is stored in its own small JSON file, so reading or
+    writing one disc never touches the others. Entries written with an
+    older VERSION of the scan results are misses and get re-scanned.
+    """
+    VERSION = 2     # 2: scan results carry each title's size, part of fingerprint_layout()
+    def __init__(self):
+        self.cache_dir = os.path.join(Config.get('Cache Directory'), "scans")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint_iso(iso_path):
+        """ISO path plus size and modification time."""
+        st = os.stat(iso_path)
+        return f"iso:{os.path.abspath(iso_path)}:{st.st_size}:{st.st_mtime_ns}"
+
+    @staticmethod
+    def mounted_size(device):
+        """Size of the disc mounted at device (a drive letter or mount point), or None.
+
+        Device nodes such as /dev/sr0 aren't mounted directories; measuring
+        them would report the size of the filesystem they live on instead.
+        """
+        if not device:
+            return None
+        mount = device if device.endswith(os.sep) else device + os.sep
+        try:
+            return shutil.disk_usage(mount).total if os.path.ismount(mount) else None
+        except OSError:
+            return None
+
+    @staticmethod
+    def fingerprint_disc(volume_label, device=None):
+        """Volume label plus the size of the mounted disc, when it can be read."""
+        size = ScanCache.mounted_size(device)
+        return f"disc:{volume_label}:{size if size is not None else ''}"
+
+    @staticmethod
+    def fingerprint_layout(volume_label, scan_results):
+        """Volume label plus every title's index, duration and size: identifies a disc (or ISO) wherever it's read from."""
+        layout = ";".join(f"{t['index']}:{t['duration']}:{t.get('size') or ''}"
+                          for t in sorted(scan_results, key=lambda t: t['index']))
+        return "layout:" + hashlib.sha1(f"{volume_label}|{layout}".encode("utf-8")).hexdigest()
+
+    def _path(self, fingerprint):
+        return os.path.join(self.cache_dir, hashlib.sha1(fingerprint.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, fingerprint):
+        if not fingerprint:
+            return None
+        try:
+            with open(self._path(fingerprint), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("fingerprint") != fingerprint or entry.get("version") != self.VERSION:
+            return None
+        return entry
+
+    def set(self, fingerprint, scan_results, titles=None):
+        entry = {
+            "fingerprint": fingerprint,
+            "version": self.VERSION,
+            "scanned_at": time.time(),
+            "scan_results": scan_results,
+            "titles": {str(k): {str(a): v for a, v in attrs.items()} for k, attrs in (titles or {}).items()},
+        }
+        tmp_path = self._path(fingerprint) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(fingerprint))
+
+    def invalidate(self, fingerprint):
+        try:
+            os.remove(self._path(fingerprint))
+        except OSError:
+            pass
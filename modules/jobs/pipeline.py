@@ -0,0 +1,144 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from config import Config
+from utils import Logger
+from modules.handlers.handbrake import HandBrakeHandler
+from modules.jobs.supervisor import JobSupervisor, JobCancelled
+from modules.jobs.watchdog import ProcessWatchdog, StallError, run_with_retries
+from data.ripdatabase import RippingDatabase
+
+class TranscodeStage:
+    """Downstream stage of the rip -> transcode pipeline.
+
+    Titles are submitted as soon as they are ripped and renamed, and a
+    pool of background workers transcodes them (one HandBrakeCLI process
+    per worker) while the drive moves on to the next title. The stage is
+    shared by every drive; submit() returns a Future so each rip batch can
+    wait for just its own titles.
+    """
+    _STOP = object()
+    CORES_PER_ENCODE = 8  # A DVD-sized x264 encode rarely scales past this
+
+    def __init__(self, transcode_func, workers=None):
+        self.transcode_func = transcode_func
+        self.workers = workers or self.default_workers()
+        self._queue = queue.Queue()
+        self._threads = []
+        self.logger = Logger.get_logger(__name__)
+
+    @classmethod
+    def default_workers(cls):
+        """Concurrent HandBrakeCLI processes: the configured value, else derived from the core count."""
+        configured = Config.get_int('Transcode Workers')
+        if configured > 0:
+            return configured
+        cores_per_encode = Config.get_int('HandBrake Threads') or cls.CORES_PER_ENCODE
+        return max(1, (os.cpu_count() or 1) // cores_per_encode)
+
+    def start(self):
+        self.logger.info(f"Starting transcode stage with {self.workers} worker(s)")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"transcode-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, title):
+        """Queue a ripped title for transcoding."""
+        future = Future()
+        self._queue.put((title, future))
+        return future
+
+    def close(self):
+        """Signal that no more titles will be submitted."""
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            title, future = item
+            try:
+                future.set_result(self.transcode_func(title))
+            except Exception as e:
+                self.logger.error(f"Transcode stage failed for {title.get('final_name')}: {e}")
+                future.set_exception(e)
+
+
+def transcode_title(title, rip_table=None, on_error=None):
+    """Transcode a single ripped title; the work a TranscodeStage worker does for the application.
+
+    Progress is shown on the title's RipTable row (rip_table if the title
+    doesn't carry one). on_error(input_path, error) is called for failures
+    the user should hear about. The title's transcode job is finished
+    whatever happens. Returns the Future of the database update marking the
+    rip transcoded, or None if the title was skipped, cancelled or failed.
+    """
+    logger = Logger.get_logger(__name__)
+    encode_dir = Config.get("Encode Directory")
+    os.makedirs(encode_dir, exist_ok=True)
+
+    raw_title = title.get('final_name') or title['title_name']
+    input_path = os.path.join(Config.get("Output Directory"), f"{raw_title}.mkv")
+    output_path = os.path.join(encode_dir, f"{raw_title}.mkv")
+    rip_table = title.get('rip_table') or rip_table
+    job_id = title.get('transcode_job')
+    supervisor = JobSupervisor.default()
+    progress = None
+    # Every return below still finishes the job, so Stop Rip never sees it as active
+    try:
+        logger.debug(f"Looking for ripped file: {input_path}")
+        if not os.path.exists(input_path):
+            logger.warning(f"Skipping: input file not found: {input_path}")
+            return None
+        if job_id and supervisor.is_cancelled(job_id):
+            rip_table.show_cancelled(title['row_index'], 'transcode')
+            return None
+        if job_id:
+            supervisor.add_output(job_id, output_path)
+
+        hb = HandBrakeHandler(input_file=input_path)
+        progress = rip_table.start_transcode_progress(title['row_index'])
+        run_with_retries(lambda: hb.transcode(output_path, progress_widget=progress, job_id=job_id),
+                         on_retry=lambda e, attempt: logger.warning(
+                             f"Transcode of {input_path} {e.reason}; retrying (attempt {attempt + 1})"))
+        marked = None
+        try:
+            marked = RippingDatabase.default().mark_transcoded(input_path)  # Rips are recorded under the MakeMKV output path
+        except Exception as e:
+            logger.warning(f"Could not mark file as transcoded: {e}")
+        if Config.get("Delete Original After Transcode"):
+            try:
+                os.remove(input_path)
+                logger.info(f"Deleted original file: {input_path}")
+            except Exception as e:
+                logger.warning(f"Could not delete original file: {input_path} — {e}")
+        return marked
+    except JobCancelled:
+        logger.info(f"Transcode of {input_path} cancelled")
+        rip_table.show_cancelled(title['row_index'], 'transcode')
+    except StallError as e:
+        # Mark the title failed and let the worker take the next job
+        logger.error(f"Failed to transcode {input_path}: {e}")
+        progress.fail()
+        if on_error and ProcessWatchdog.notify():
+            on_error(input_path, e)
+    except Exception as e:
+        logger.error(f"Failed to transcode {input_path}: {e}")
+        if progress:
+            progress.fail()
+        if on_error:
+            on_error(input_path, e)
+    finally:
+        if job_id:
+            supervisor.finish(job_id)
+    return None
@@ -0,0 +1,120 @@
+import os
+import subprocess
+import threading
+
+from utils import Logger
+
+class JobCancelled(Exception):
+    """Raised by a worker when the job it is running has been cancelled."""
+
+
+class Job:
+    def __init__(self, job_id, outputs=()):
+        self.job_id = job_id
+        self.outputs = list(outputs)    # Partial files removed if the job is cancelled
+        self.processes = []
+        self.cancelled = False
+
+
+class JobSupervisor:
+    """Tracks every child process launched for a rip or transcode job.
+
+    Workers start their children through popen() so that a single job, or
+    the whole queue, can be cancelled from the UI. Cancelling escalates from
+    terminate() to kill(), then deletes the job's partial outputs; the worker
+    sees its child exit straight away and moves on to the next queued job.
+    """
+    TERMINATE_TIMEOUT = 5
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.logger = Logger.get_logger(__name__)
+
+    @classmethod
+    def default(cls):
+        """The process-wide supervisor shared by all handlers."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def register(self, job_id, outputs=()):
+        """Start tracking a job (queued or running); re-registering resets a finished job."""
+        with self._lock:
+            job = self._jobs[job_id] = Job(job_id, outputs)
+        return job
+
+    def add_output(self, job_id, path):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.outputs.append(path)
+
+    def popen(self, job_id, args, **kwargs):
+        """Launch a child process on behalf of a job."""
+        with self._lock:
+            job = self._jobs.get(job_id) or self._jobs.setdefault(job_id, Job(job_id))
+            if job.cancelled:
+                raise JobCancelled(job_id)
+            process = subprocess.Popen(args, **kwargs)
+            job.processes.append(process)
+        return process
+
+    def is_cancelled(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return bool(job and job.cancelled)
+
+    def finish(self, job_id):
+        """Stop tracking a job once its worker is done with it."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def cancel(self, job_id):
+        """Cancel one job; returns False if the job is not known."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.cancelled:
+                return False
+            job.cancelled = True
+        self.logger.info(f"Cancelling job {job_id}")
+        threading.Thread(target=self._stop, args=(job,), daemon=True).start()
+        return True
+
+    def cancel_all(self):
+        """Cancel every running and queued job."""
+        with self._lock:
+            job_ids = list(self._jobs)
+        return sum(self.cancel(job_id) for job_id in job_ids)
+
+    def active_jobs(self):
+        with self._lock:
+            return [job_id for job_id, job in self._jobs.items() if not job.cancelled]
+
+    @classmethod
+    def terminate(cls, process):
+        """Terminate a child, escalating to kill() if it doesn't exit in time."""
+        if process.poll() is not None:
+            return
+        process.terminate()  # Sends SIGTERM on Unix, or terminates on Windows
+        try:
+            process.wait(timeout=cls.TERMINATE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            Logger.get_logger(__name__).warning(f"Process {process.pid} ignored terminate; killing it")
+            process.kill()
+            process.wait()
+
+    def _stop(self, job):
+        for process in job.processes:
+            self.terminate(process)
+        # Only remove partial outputs once nothing holds them open any more
+        for path in job.outputs:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+                    self.logger.info(f"Removed partial output: {path}")
+            except OSError as e:
+                self.logger.warning(f"Could not remove partial output {path}: {e}")
@@ -0,0 +1,96 @@
+import time
+import threading
+
+from config import Config
+from utils import Logger
+from modules.jobs.supervisor import JobSupervisor
+from data.ripdatabase import RippingDatabase
+
+class StallError(RuntimeError):
+    """Raised when a child process stalled or ran past its overall timeout and was killed."""
+    def __init__(self, job_id, reason):
+        super().__init__(f"{job_id or 'job'} stalled: {reason}")
+        self.job_id = job_id
+        self.reason = reason
+
+
+class ProcessWatchdog:
+    """Supervises one makemkvcon/HandBrakeCLI child.
+
+    The child's output is consumed by a reader on a helper thread, so the
+    calling worker never blocks on a silent pipe. The worker polls a
+    progress probe; if the probe stops changing for longer than the stall
+    timeout, or the job exceeds its overall timeout, the child is killed,
+    the event is recorded and StallError is raised.
+    """
+    POLL_INTERVAL = 1.0
+    # The stalled child is always killed; the action decides what happens to its title next
+    ACTIONS = {
+        'retry': "run the title again, up to Stall Retries times, then mark it failed",
+        'fail': "mark the title failed and move on to the next one",
+    }
+
+    def __init__(self, process, job_id=None, kind="rip", stall_timeout=None, overall_timeout=None):
+        self.process = process
+        self.job_id = job_id
+        self.kind = kind
+        self.stall_timeout = Config.get_int('Stall Timeout') if stall_timeout is None else stall_timeout
+        self.overall_timeout = Config.get_int('Job Timeout') if overall_timeout is None else overall_timeout
+        self.logger = Logger.get_logger(__name__)
+
+    @staticmethod
+    def stall_action():
+        action = Config.get('Stall Action')
+        if action == 'kill':
+            return 'fail'   # Older settings: 'kill' was 'fail' with an error dialog (see notify())
+        return action if action in ProcessWatchdog.ACTIONS else 'retry'
+
+    @staticmethod
+    def notify():
+        """Whether a title that finally failed on a stall is also reported in an error dialog."""
+        return bool(Config.get('Stall Notify')) or Config.get('Stall Action') == 'kill'
+
+    def run(self, reader, progress_probe):
+        """Run reader(process.stdout) until EOF, enforcing the stall and overall timeouts."""
+        thread = threading.Thread(target=reader, args=(self.process.stdout,), daemon=True)
+        thread.start()
+        started = last_progress = time.monotonic()
+        last_seen = progress_probe()
+        while thread.is_alive():
+            thread.join(self.POLL_INTERVAL)
+            now = time.monotonic()
+            seen = progress_probe()
+            if seen != last_seen:
+                last_seen, last_progress = seen, now
+                continue
+            if self.stall_timeout and now - last_progress > self.stall_timeout:
+                reason = f"no progress for {int(now - last_progress)}s"
+            elif self.overall_timeout and now - started > self.overall_timeout:
+                reason = f"exceeded the {self.overall_timeout}s job timeout"
+            else:
+                continue
+            self._record(reason, now - started)
+            JobSupervisor.terminate(self.process)
+            thread.join(self.POLL_INTERVAL)  # The reader sees EOF once the child is gone
+            raise StallError(self.job_id, reason)
+
+    def _record(self, reason, elapsed):
+        action = self.stall_action()
+        self.logger.warning(f"Watchdog: {self.kind} job {self.job_id} {reason}; action: {action}")
+        try:
+            RippingDatabase.default().add_stall_event(self.job_id, self.kind, reason, int(elapsed), action)
+        except Exception as e:
+            self.logger.warning(f"Could not record stall event: {e}")
+
+
+def run_with_retries(func, on_retry=None):
+    """Call func(); after a stall, call it again while the stall action is 'retry' and retries remain."""
+    retries = Config.get_int('Stall Retries') if ProcessWatchdog.stall_action() == 'retry' else 0
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except StallError as e:
+            if attempt >= retries:
+                raise
+            if on_retry:
+                on_retry(e, attempt + 1)
@@ -1,18 +1,48 @@
+import sys
 import subprocess
 import logging
 from logging.handlers import RotatingFileHandler
 
 class DiscUtils:
     @staticmethod
-    def is_disc_inserted():
-        """Check if a disc is inserted in the drive."""
+    def is_disc_inserted(drive=None):
+        """Check if a disc is inserted in the given drive (any drive when none is given)."""
         try:
-            result = subprocess.run(['wmic', 'cdrom', 'get', 'MediaLoaded'], capture_output=True, text=True)
-            return "TRUE" in result.stdout
+            result = subprocess.run(['wmic', 'cdrom', 'get', 'Drive,MediaLoaded'], capture_output=True, text=True)
+            if drive is None:
+                return "TRUE" in result.stdout
+            for line in result.stdout.splitlines():
+                parts = line.split()
+                if len(parts) == 2 and parts[0].upper() == drive.upper():
+                    return parts[1] == "TRUE"
+            return False
         except subprocess.CalledProcessError as e:
             print(f"ERROR: Failed to check disc status: {e}")
             return False
 
+    @staticmethod
+    def get_volume_label(drive="D:"):
+        """Return the volume label of the disc in the given drive, or "" if there is none."""
+        result = subprocess.run(
+            ["wmic", "volume", "where", f"DriveLetter='{drive}'", "get", "Label"],
+            capture_output=True, text=True, check=True
+        )
+        lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        # Find the first line that isn't the header
+        for line in lines:
+            if line.lower() != "label":
+                return line
+        return ""
+
+class ProcessUtils:
+    @staticmethod
+    def command(args):
+        """Return args ready for Popen; a .py tool (e.g. the benchmark simulators) is run with this interpreter."""
+        args = list(args)
+        if args and str(args[0]).lower().endswith(".py"):
+            return [sys.executable] + args
+        return args
+
 class Logger:
     @staticmethod
     def get_logger(name, log_file="./logs/app.log", level=logging.DEBUG):
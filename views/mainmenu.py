@@ -21,9 +21,16 @@ class MainMenu(tk.Menu):
         edit_menu.add_command(label="Edit Metadata", command=callbacks["edit -> edit_metadata"])
         edit_menu.add_command(label="Edit Titles", command=callbacks["edit -> edit_titles"])
 
+        # Create the Rip menu
+        rip_menu = tk.Menu(self, tearoff=0)
+        rip_menu.add_command(label="Start Rip", command=callbacks["rip -> start_rip"])
+        rip_menu.add_command(label="Stop Rip", command=callbacks["rip -> stop_rip"])
+        rip_menu.add_command(label="Cancel Selected Titles", command=callbacks["rip -> cancel_selected"])
+
         # Create the Tools menu
         tools_menu = tk.Menu(self, tearoff=0)
         tools_menu.add_command(label="History", command=callbacks["tools -> history"])
+        tools_menu.add_command(label="Retry Failed Lookups", command=callbacks["tools -> clear_negative_cache"])
         tools_menu.add_separator()
         tools_menu.add_command(label="Preferences", command=callbacks["tools -> preferences"])
 
@@ -34,6 +41,7 @@ class MainMenu(tk.Menu):
         # Add menus to the main menu
         self.add_cascade(label="File", menu=file_menu)
         self.add_cascade(label="Edit", menu=edit_menu)
+        self.add_cascade(label="Rip", menu=rip_menu)
         self.add_cascade(label="Tools", menu=tools_menu)
         self.add_cascade(label="Help", menu=help_menu)
 
@@ -31,6 +31,9 @@ class ToolBar(tk.Frame):
         self.btn_rip = ttk.Button(self, text="Start", image=self.btn_images['start_rip'], compound=tk.LEFT,
                    command=self.callbacks['rip -> start_rip'], state=tk.DISABLED)
         self.btn_rip.pack(side=tk.LEFT, padx=2, pady=2)
+        self.btn_stop = ttk.Button(self, text="Stop", image=self.btn_images['stop_rip'], compound=tk.LEFT,
+                   command=self.callbacks['rip -> stop_rip'])
+        self.btn_stop.pack(side=tk.LEFT, padx=2, pady=2)
         ttk.Button(self, text="Rip History", image=self.btn_images['rip_library'], compound=tk.LEFT,
                    command=self.callbacks["tools -> history"]).pack(side=tk.LEFT, padx=2, pady=2)
         ttk.Button(self, text="Preferences", image=self.btn_images['preferences'], compound=tk.LEFT,
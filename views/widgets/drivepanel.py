@@ -0,0 +1,122 @@
+import os
+import tkinter as tk
+from tkinter import ttk
+
+from views.widgets.riptable import RipTable
+from modules.jobs.progress_bus import ProgressBus
+from modules.handlers.scan_cache import ScanCache
+
+class DrivePanel(ttk.Frame):
+    """Title table, status line and disc state for one optical drive or ISO image."""
+    def __init__(self, parent, app, columns, drive=None, iso_path=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.app = app
+        self.drive = drive          # DRV entry from MakeMKVHandler.list_drives(), None for an ISO
+        self.iso_path = iso_path
+        self.rows = []
+        self.options = []
+        self.current_title = None
+        self.media_type = None
+        self.title_year = None
+        self.disc_metadata = None   # Values shown in the metadata table for this disc
+        self.omdb_info = None       # Resolved title, show and season, remembered once the user confirms them
+        self.show = None
+        self.season = None
+        self.poster_img = None
+        self.lookup = 0             # Bumped by every metadata lookup; results of superseded ones are dropped
+        self.awaiting_layout = False    # Learned title still to be checked once the scan gives the disc a key
+        self.rip_thread = None
+        self.scan_thread = None     # Scan (or background re-scan) still holding the drive
+
+        self.rip_table = RipTable(self, columns, self.rows, self.options)
+        self.rip_table.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        self.status_var = tk.StringVar(value="Ready")
+        self.status_bar = ttk.Label(self, textvariable=self.status_var, relief=tk.SUNKEN, anchor="w")
+        self.status_bar.pack(side=tk.TOP, fill=tk.X, padx=5)
+
+    def load_disc(self, drive=None, iso_path=None):
+        """Switch the tab to a newly loaded disc, dropping everything known about the previous one."""
+        self.drive = drive
+        self.iso_path = iso_path
+        self.rows = []
+        self.options.clear()    # Shared with the RipTable
+        self.current_title = None
+        self.media_type = None
+        self.title_year = None
+        self.disc_metadata = None
+        self.omdb_info = None
+        self.show = None
+        self.season = None
+        self.poster_img = None
+        self.lookup += 1
+        self.awaiting_layout = False
+        self.rip_table.row_data = self.rows
+        self.rip_table.rebuild()
+        self.set_status("Ready")
+
+    @property
+    def disc_idx(self):
+        return self.drive['index'] if self.drive else 0
+
+    @property
+    def device(self):
+        return self.drive['device'] if self.drive else None
+
+    @property
+    def volume_label(self):
+        return self.drive['disc_name'] if self.drive else None
+
+    @property
+    def disc_key(self):
+        """Key of this disc in the learned label -> title table (None if the disc can't be identified yet).
+
+        Never the volume label alone: generic labels like DVD_VIDEO would all
+        map to one title. Without a mounted size to go with the label (e.g.
+        a /dev/sr0 device node) the disc is only known by its scanned layout.
+        """
+        try:
+            if self.iso_path:
+                return ScanCache.fingerprint_iso(self.iso_path)
+            if self.volume_label and ScanCache.mounted_size(self.device) is not None:
+                return ScanCache.fingerprint_disc(self.volume_label, self.device)
+        except OSError:
+            return None
+        return self.layout_key
+
+    @property
+    def disc_label(self):
+        """Volume label of the disc, or the ISO's file name."""
+        if self.iso_path:
+            return os.path.splitext(os.path.basename(self.iso_path))[0]
+        return self.volume_label
+
+    @property
+    def layout_key(self):
+        """Key of this disc in the rip database, from its label and scanned titles (None until it's scanned)."""
+        return ScanCache.fingerprint_layout(self.disc_label, self.rows) if self.rows else None
+
+    @property
+    def label(self):
+        if self.iso_path:
+            return f"ISO: {os.path.basename(self.iso_path)}"
+        if self.drive:
+            return f"{self.device or 'Drive ' + str(self.disc_idx)} {self.drive['disc_name']}".strip()
+        return "Disc/ISO"
+
+    def is_busy(self):
+        return self.rip_thread is not None and self.rip_thread.is_alive()
+
+    def set_status(self, text):
+        self.status_var.set(text)
+
+    def post_status(self, text):
+        """Thread-safe set_status: only the latest text per frame reaches the status line."""
+        ProgressBus.default().publish(("status", self), lambda: self.set_status(text))
+
+    # rip_selected() looks these up on the RipTable's master
+    @property
+    def transcode_stage(self):
+        return self.app.transcode_stage
+
+    def on_transcode_complete(self):
+        self.app.on_transcode_complete()
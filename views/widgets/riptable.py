@@ -1,9 +1,42 @@
 import tkinter as tk
 from tkinter import ttk
 
+from modules.jobs.progress_bus import ProgressBus
+
+class RowProgress:
+    """Worker-side handle on one row's rip or transcode cell.
+
+    Safe to use from any thread: set() and fail() only publish the cell's
+    new state to the ProgressBus, and the Tk thread applies the latest one.
+    """
+    def __init__(self, table, row_index, kind):
+        self.table = table
+        self.row_index = row_index
+        self.kind = kind
+        self.percent = 0
+
+    @staticmethod
+    def key(table, row_index, kind):
+        return ("cell", table, kind, row_index)
+
+    def set(self, percent):
+        self.percent = percent
+        ProgressBus.default().publish(self.key(self.table, self.row_index, self.kind),
+                                      lambda: self.table.show_progress(self.row_index, self.kind, percent))
+
+    def fail(self):
+        percent = self.percent
+        ProgressBus.default().publish(self.key(self.table, self.row_index, self.kind),
+                                      lambda: self.table.show_progress(self.row_index, self.kind, percent, failed=True))
+
+
 class RipTable(tk.LabelFrame):
+    _instances = 0
+
     def __init__(self, parent, columns, row_data, cmb_options, *args, **kwargs):
         super().__init__(parent, text="Titles from Disc/ISO", *args, **kwargs)
+        RipTable._instances += 1
+        self._style_prefix = f"t{RipTable._instances}r"
         self.parent = parent
         self.on_selection_change = None  # Callback for selection change
         self.columns = columns
@@ -13,6 +46,7 @@ class RipTable(tk.LabelFrame):
         self.combobox_vars = []
         self.rip_widgets = []
         self.transcode_widgets = []
+        self._styles = set()
 
         self.create_widgets()
 
@@ -75,6 +109,17 @@ class RipTable(tk.LabelFrame):
             self.selected_vars.append(selected)
             self.combobox_vars.append(combo_val)
     
+    def rebuild(self):
+        """Clear the table and rebuild it from row_data and cmb_options."""
+        self.selected_vars.clear()
+        self.combobox_vars.clear()
+        self.rip_widgets.clear()
+        self.transcode_widgets.clear()
+        for widget in self.inner_frame.winfo_children():
+            widget.destroy()
+        self.build_header()
+        self.build_rows()
+
     def get_selected(self):
         """Returns a list of selected rows with their data."""
         results = []
@@ -92,38 +137,64 @@ class RipTable(tk.LabelFrame):
         """Resize the inner frame to fit the canvas."""
         self.canvas.itemconfig(self.canvas_window, width=event.width)
 
+    def job_id(self, kind, row_index):
+        """Supervisor job id for the rip or transcode of one row."""
+        return f"{kind}:{self._style_prefix}{row_index}"
+
+    # Called from worker threads: they only hand state to the ProgressBus
+
     def start_rip_progress(self, row_index):
-        # Destroy old label
-        self.rip_widgets[row_index].destroy()    
-        # Create and insert progress bar
-        style = ttk.Style(self.inner_frame)
-        style.layout('text.Horizontal.TProgressbar',
-                     [('Horizontal.Progressbar.trough',
-                       {'children': [('Horizontal.Progressbar.pbar',
-                                      {'side': 'left', 'sticky': 'ns'})],
-                        'sticky': 'nsew'}),
-                       ('Horizontal.Progressbar.label', {'sticky': 'nswe'})])
-        style.configure('text.Horizontal.TProgressbar', text='0%', anchor='center')
-        variable = tk.StringVar(self.inner_frame)
-        rip_progress = ttk.Progressbar(self.inner_frame, orient=tk.HORIZONTAL, length=100,
-                                           mode='determinate', style='text.Horizontal.TProgressbar', variable=variable)
-        rip_progress.grid(row=row_index + 1, column=4, sticky=tk.EW, padx=5)  # +1 for header row
-        self.rip_widgets[row_index] = rip_progress
-        return rip_progress  # So the caller can update the progress bar
-    
+        """Turn a row's rip cell into a progress bar; returns the RowProgress that updates it."""
+        progress = RowProgress(self, row_index, 'rip')
+        progress.set(0)
+        return progress
+
     def start_transcode_progress(self, row_index):
-        self.transcode_widgets[row_index].destroy()
-        style = ttk.Style(self.inner_frame)
-        style.layout('transcode.Horizontal.TProgressbar',
-                     [('Horizontal.Progressbar.trough',
-                       {'children': [('Horizontal.Progressbar.pbar',
-                                      {'side': 'left', 'sticky': 'ns'})],
-                        'sticky': 'nsew'}),
-                       ('Horizontal.Progressbar.label', {'sticky': 'nswe'})])
-        style.configure('transcode.Horizontal.TProgressbar', text='0%', anchor='center')
-        variable = tk.StringVar(self.inner_frame)
-        transcode_progress = ttk.Progressbar(self.inner_frame, orient=tk.HORIZONTAL, length=100,
-                                                 mode='determinate', style='transcode.Horizontal.TProgressbar', variable=variable)
-        transcode_progress.grid(row=row_index + 1, column=5, sticky=tk.EW, padx=5)
-        self.transcode_widgets[row_index] = transcode_progress
-        return transcode_progress
+        progress = RowProgress(self, row_index, 'transcode')
+        progress.set(0)
+        return progress
+
+    def show_cancelled(self, row_index, kind='rip'):
+        ProgressBus.default().publish(RowProgress.key(self, row_index, kind),
+                                      lambda: self._show_label(row_index, kind, "Cancelled"))
+
+    # Tk thread only
+
+    def _cell(self, kind):
+        return (self.rip_widgets, 4) if kind == 'rip' else (self.transcode_widgets, 5)
+
+    def _show_label(self, row_index, kind, text):
+        widgets, column = self._cell(kind)
+        widgets[row_index].destroy()
+        label = ttk.Label(self.inner_frame, text=text, font=("Arial", 10), anchor=tk.CENTER)
+        label.grid(row=row_index + 1, column=column, sticky=tk.EW, padx=5)  # +1 for header row
+        widgets[row_index] = label
+
+    def _row_style(self, base, row_index):
+        """Create (once) a per-row progress bar style so every row can show its own percentage."""
+        style_name = f"{self._style_prefix}{row_index}.{base}.Horizontal.TProgressbar"
+        if style_name not in self._styles:
+            style = ttk.Style(self.inner_frame)
+            style.layout(style_name,
+                         [('Horizontal.Progressbar.trough',
+                           {'children': [('Horizontal.Progressbar.pbar',
+                                          {'side': 'left', 'sticky': 'ns'})],
+                            'sticky': 'nsew'}),
+                           ('Horizontal.Progressbar.label', {'sticky': 'nswe'})])
+            self._styles.add(style_name)
+        return style_name
+
+    def show_progress(self, row_index, kind, percent, failed=False):
+        """Show percent on a row's progress bar, creating the bar if the cell still holds a label."""
+        widgets, column = self._cell(kind)
+        style_name = self._row_style('text' if kind == 'rip' else 'transcode', row_index)
+        bar = widgets[row_index]
+        if not isinstance(bar, ttk.Progressbar):
+            bar.destroy()
+            bar = ttk.Progressbar(self.inner_frame, orient=tk.HORIZONTAL, length=100, mode='determinate')
+            bar.grid(row=row_index + 1, column=column, sticky=tk.EW, padx=5)
+            widgets[row_index] = bar
+        bar["value"] = percent
+        bar.config(style="red.Horizontal.TProgressbar" if failed else style_name)
+        if not failed:
+            ttk.Style().configure(style_name, text=f"{percent}%", anchor='center')
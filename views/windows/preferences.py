@@ -78,6 +78,21 @@ class PreferencesWindow(tk.Toplevel):
                 self.fields[setting] = input_widget
                 input_widget.grid(row=i, column=0, columnspan=2, sticky=tk.EW, padx=5, pady=5)
                 continue
+            elif setting in Config.CHOICES:
+                input_widget = LabelInput(
+                    self.settings_frame,
+                    label=setting,
+                    input_class=ttk.Combobox,
+                    input_var=input_var,
+                    input_args={
+                        'textvariable': input_var,
+                        'values': Config.CHOICES[setting],
+                        'state': 'readonly'
+                    }
+                )
+                self.fields[setting] = input_widget
+                input_widget.grid(row=i, column=0, columnspan=2, sticky=tk.EW, padx=5, pady=5)
+                continue
             elif setting == 'HandBrake Presets':
                 preset_cat_var = tk.StringVar()
                 preset_name_var = tk.StringVar()
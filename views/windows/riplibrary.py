@@ -1,24 +1,158 @@
+import threading
 import tkinter as tk
 from tkinter import ttk
 
+from utils import Logger
 from data.ripdatabase import RippingDatabase
 
 class RipLibraryWindow(tk.Toplevel):
+    """Every rip in the database, searchable and filterable.
+
+    Rows are fetched a page at a time on a worker thread and appended as the
+    list is scrolled towards its end. Typing in the search box, changing a
+    filter or clicking a sortable heading starts a new query; results of a
+    query that has since been superseded are dropped.
+    """
+    PAGE_SIZE = 200
+    SEARCH_DELAY = 150          # ms of typing pause before searching
+    LOAD_AHEAD = 0.9            # Fetch the next page once this fraction of the list has been scrolled past
+    COLUMNS = ("Title", "Disc Title", "Output Path", "Ripped At", "Transcoded")
+    SORTABLE = {"Title": 'title', "Ripped At": 'ripped_at'}
+    TRANSCODED = {"All": None, "Yes": True, "No": False}
+
     def __init__(self, parent):
         super().__init__(parent)
         self.title("Rip Library")
-        self.geometry("800x400")
+        self.geometry("900x500")
+        self.logger = Logger.get_logger(__name__)
+        self.db = RippingDatabase.default()
+        self.sort = 'ripped_at'
+        self.descending = True
+        self.cursor = None          # Keyset cursor of the next page; None once everything is loaded
+        self.generation = 0         # Bumped by every new query, so stale pages are ignored
+        self.loading = False
+        self.loaded = 0
+        self._search_job = None
         self.create_widgets()
+        self.reload()
 
     def create_widgets(self):
-        columns = ("Title", "Disc Title", "Output Path", "Ripped At", "Transcoded")
-        tree = ttk.Treeview(self, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=200 if col != "Output Path" else 300)
+        filters = ttk.Frame(self)
+        filters.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        ttk.Label(filters, text="Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.schedule_reload())
+        search = ttk.Entry(filters, textvariable=self.search_var, width=30)
+        search.pack(side=tk.LEFT, padx=(2, 10))
+        search.focus()
+
+        ttk.Label(filters, text="Transcoded:").pack(side=tk.LEFT)
+        self.transcoded_var = tk.StringVar(value="All")
+        transcoded = ttk.Combobox(filters, textvariable=self.transcoded_var, values=list(self.TRANSCODED),
+                                  state="readonly", width=5)
+        transcoded.bind("<<ComboboxSelected>>", lambda e: self.reload())
+        transcoded.pack(side=tk.LEFT, padx=(2, 10))
+
+        self.date_from_var = tk.StringVar()
+        self.date_to_var = tk.StringVar()
+        for text, var in (("From:", self.date_from_var), ("To:", self.date_to_var)):
+            ttk.Label(filters, text=text).pack(side=tk.LEFT)
+            entry = ttk.Entry(filters, textvariable=var, width=11)
+            entry.pack(side=tk.LEFT, padx=(2, 10))
+            var.trace_add("write", lambda *args: self.schedule_reload())
+        ttk.Label(filters, text="(YYYY-MM-DD)").pack(side=tk.LEFT)
+
+        table = ttk.Frame(self)
+        table.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.tree = ttk.Treeview(table, columns=self.COLUMNS, show="headings")
+        for col in self.COLUMNS:
+            if col in self.SORTABLE:
+                self.tree.heading(col, text=col, command=lambda c=col: self.on_sort(c))
+            else:
+                self.tree.heading(col, text=col)
+            self.tree.column(col, width=200 if col != "Output Path" else 300)
+        scrollbar = ttk.Scrollbar(table, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: self.on_scroll(scrollbar, first, last))
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.status_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.status_var, anchor="w").pack(fill=tk.X, padx=10, pady=(0, 10))
+
+    def schedule_reload(self):
+        """Debounce search-as-you-type: query once typing pauses."""
+        if self._search_job:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DELAY, self.reload)
+
+    def filters(self):
+        date_from, date_to = self.date_from_var.get().strip(), self.date_to_var.get().strip()
+        return {
+            'search': self.search_var.get().strip(),
+            'transcoded': self.TRANSCODED[self.transcoded_var.get()],
+            # Half-typed dates are ignored rather than filtering everything out
+            'date_from': date_from if len(date_from) == 10 else None,
+            'date_to': date_to if len(date_to) == 10 else None,
+            'sort': self.sort,
+            'descending': self.descending,
+        }
+
+    def reload(self):
+        """Start over from the first page with the current search, filters and sort order."""
+        self._search_job = None
+        self.generation += 1
+        self.tree.delete(*self.tree.get_children())
+        self.loaded = 0
+        self.cursor = None
+        self.loading = False
+        self.load_page(first=True)
+
+    def load_page(self, first=False):
+        if self.loading or (not first and self.cursor is None):
+            return
+        self.loading = True
+        generation, filters, after = self.generation, self.filters(), self.cursor
+        self.status_var.set("Loading..." if first else f"{self.loaded} rip(s), loading more...")
+
+        def run():
+            try:
+                rows, cursor = self.db.query_rips(after=after, limit=self.PAGE_SIZE, **filters)
+                error = None
+            except Exception as e:
+                rows, cursor, error = [], None, e
+            try:
+                self.after(0, lambda: self.show_page(generation, rows, cursor, error))
+            except (RuntimeError, tk.TclError):
+                pass  # The window was closed while the page loaded
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def show_page(self, generation, rows, cursor, error):
+        if generation != self.generation or not self.winfo_exists():
+            return
+        self.loading = False
+        if error:
+            self.logger.error(f"Rip library query failed: {error}")
+            self.status_var.set(f"Query failed: {error}")
+            return
+        for row in rows:
+            self.tree.insert("", tk.END, iid=row[0], values=row[1:])
+        self.loaded += len(rows)
+        self.cursor = cursor
+        # The Treeview then reports its new scroll position, which fetches another page if this one didn't fill it
+        self.status_var.set(f"{self.loaded} rip(s)" + (", scroll for more" if cursor else ""))
 
-        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    def on_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        if float(last) >= self.LOAD_AHEAD:
+            self.load_page()
 
-        db = RippingDatabase()
-        for row in db.list_recent_rips():
-            tree.insert("", tk.END, values=row)
+    def on_sort(self, col):
+        sort = self.SORTABLE[col]
+        self.descending = not self.descending if sort == self.sort else sort == 'ripped_at'
+        self.sort = sort
+        for name in self.SORTABLE:
+            arrow = (" ▼" if self.descending else " ▲") if self.SORTABLE[name] == sort else ""
+            self.tree.heading(name, text=name + arrow)
+        self.reload()